@@ -0,0 +1,24 @@
+# app/core/_njit.py
+"""
+Compatibilidad opcional con Numba.
+
+Si numba no está instalado, ``njit`` devuelve la función sin compilar y
+``prange`` equivale a ``range``, de modo que los núcleos numéricos siguen
+funcionando en Python puro.
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Decorador identidad usado cuando numba no está disponible."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -2,12 +2,21 @@
 import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 import math
+import functools
 from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple, fields
 from datetime import datetime
 import logging
 
+from ._njit import njit, prange, NUMBA_AVAILABLE
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
@@ -28,6 +37,142 @@ class CropParameters:
     ph_optimo: float
     conductividad_optima: float
 
+# Posición de cada campo de CropParameters en las filas de CROP_PARAMS_ARR
+_COL = {f.name: i for i, f in enumerate(fields(CropParameters))}
+
+# Núcleos numéricos (compilados con Numba si está disponible)
+
+@njit(cache=True)
+def _clip(value, low, high):
+    """Acotar un escalar sin pasar por np.clip ni por las funciones min/max."""
+    return low if value < low else (high if value > high else value)
+
+@njit(cache=True, fastmath=True)
+def _fertility_core(
+    nitrogen, phosphorus, potassium, organic_matter, ph, ndvi,
+    n_inv, p_inv, k_inv, om_inv, ph_opt, month_factor
+):
+    """
+    Índice de fertilidad y componentes normalizados.
+    
+    Los argumentos *_inv son 1 / (óptimo * 1.5), precalculados por el llamador.
+    """
+    n_norm = _clip(nitrogen * n_inv, 0.0, 1.0)
+    p_norm = _clip(phosphorus * p_inv, 0.0, 1.0)
+    k_norm = _clip(potassium * k_inv, 0.0, 1.0)
+    om_norm = _clip(organic_matter * om_inv, 0.0, 1.0)
+    ph_norm = 1.0 - math.fabs(ph - ph_opt) / 4.0
+    
+    fertility_index = (
+        n_norm * 0.25 +
+        p_norm * 0.20 +
+        k_norm * 0.20 +
+        om_norm * 0.15 +
+        ph_norm * 0.10 +
+        ndvi * 0.10
+    ) * month_factor
+    fertility_index = _clip(fertility_index, 0.0, 1.0)
+    
+    return fertility_index, n_norm, p_norm, k_norm, om_norm, ph_norm
+
+@njit(cache=True, fastmath=True)
+def _npk_core(
+    nitrogen, phosphorus, potassium, ndvi, organic_matter, ph,
+    n_opt, p_opt, k_opt
+):
+    """Déficit y dosis recomendada de N, P y K."""
+    # Nitrógeno
+    n_deficit = max(0.0, n_opt - nitrogen)
+    n_om_factor = max(0.7, 1.0 - (organic_matter / 15.0))
+    n_ndvi_factor = 1.0 + (0.5 - ndvi) * 0.4
+    n_recommendation = n_deficit * 1.4 * 1.2 * n_om_factor * n_ndvi_factor
+    n_recommendation = _clip(n_recommendation, 20.0, 250.0)
+    
+    # Fósforo
+    p_deficit = max(0.0, p_opt - phosphorus)
+    p_ph_factor = 1.3 if ph < 5.5 or ph > 7.5 else 1.0
+    p_recommendation = _clip(p_deficit * 1.6 * p_ph_factor, 10.0, 120.0)
+    
+    # Potasio
+    k_deficit = max(0.0, k_opt - potassium)
+    k_texture_factor = 1.2 if organic_matter < 2.0 else 1.0
+    k_yield_factor = 1.0 + (0.5 - ndvi) * 0.3
+    k_recommendation = k_deficit * 1.3 * k_texture_factor * k_yield_factor
+    k_recommendation = _clip(k_recommendation, 15.0, 200.0)
+    
+    return n_deficit, n_recommendation, p_deficit, p_recommendation, k_deficit, k_recommendation
+
+@njit(cache=True, fastmath=True)
+def _yield_core(
+    fertility_index, solar_radiation, precipitation, wind_speed, ndvi,
+    temperature, base_yield, yield_cap
+):
+    """Potencial de cosecha en t/ha (acotado a yield_cap)."""
+    rad_factor = _clip(solar_radiation / 20.0, 0.5, 1.2)
+    water_factor = _clip(precipitation / 6.0, 0.3, 1.5)
+    wind_factor = _clip(1.0 - (wind_speed - 2.0) / 10.0, 0.7, 1.0)
+    temp_factor = 1.0 - math.fabs(temperature - 25.0) / 20.0
+    ndvi_factor = _clip(ndvi / 0.8, 0.5, 1.2)
+    
+    yield_potential = (
+        base_yield *
+        fertility_index *
+        rad_factor *
+        water_factor *
+        wind_factor *
+        temp_factor *
+        ndvi_factor
+    )
+    
+    return _clip(yield_potential, 0.0, yield_cap)
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _zones_core(
+    nitrogen, phosphorus, potassium, organic_matter, ph, ndvi,
+    n_opt, p_opt, k_opt, om_opt, ph_opt, month_factor, fert_thresh
+):
+    """
+    Fertilidad, tramo de clasificación y dosis NPK de todas las zonas en un único bucle.
+    
+    El tramo es el número de umbrales de fert_thresh alcanzados por el índice
+    (equivale a np.searchsorted(fert_thresh, indice, side='right')).
+    """
+    n_rows = nitrogen.shape[0]
+    n_thresh = fert_thresh.shape[0]
+    fertility_index = np.empty(n_rows)
+    tier = np.empty(n_rows, dtype=np.int8)
+    rec_n = np.empty(n_rows)
+    rec_p = np.empty(n_rows)
+    rec_k = np.empty(n_rows)
+    
+    n_inv = 1.0 / (n_opt * 1.5)
+    p_inv = 1.0 / (p_opt * 1.5)
+    k_inv = 1.0 / (k_opt * 1.5)
+    om_inv = 1.0 / (om_opt * 1.5)
+    
+    for i in prange(n_rows):
+        fi = _fertility_core(
+            nitrogen[i], phosphorus[i], potassium[i], organic_matter[i], ph[i], ndvi[i],
+            n_inv, p_inv, k_inv, om_inv, ph_opt, month_factor
+        )[0]
+        fertility_index[i] = fi
+        
+        level = 0
+        for j in range(n_thresh):
+            if fi >= fert_thresh[j]:
+                level += 1
+        tier[i] = level
+        
+        npk = _npk_core(
+            nitrogen[i], phosphorus[i], potassium[i], ndvi[i], organic_matter[i], ph[i],
+            n_opt, p_opt, k_opt
+        )
+        rec_n[i] = npk[1]
+        rec_p[i] = npk[3]
+        rec_k[i] = npk[5]
+    
+    return fertility_index, tier, rec_n, rec_p, rec_k
+
 class SoilAnalyzer:
     """Analizador principal de suelo y fertilidad."""
     
@@ -62,6 +207,20 @@ class SoilAnalyzer:
         )
     }
     
+    # Mismos parámetros en un arreglo plano (n_cultivos, 13) indexado por CROP_IDX
+    CROP_IDX = {crop: i for i, crop in enumerate(CROP_PARAMETERS)}
+    CROP_PARAMS_ARR = np.array(
+        [astuple(params) for params in CROP_PARAMETERS.values()],
+        dtype=np.float64
+    )
+    
+    # Potencial base por cultivo (t/ha)
+    BASE_YIELD = {
+        'PALMA_ACEITERA': 25.0,
+        'CACAO': 1.5,
+        'BANANO': 40.0
+    }
+    
     # Factores estacionales
     MONTH_FACTORS = {
         "ENERO": 0.9, "FEBRERO": 0.95, "MARZO": 1.0, "ABRIL": 1.05,
@@ -69,6 +228,17 @@ class SoilAnalyzer:
         "SEPTIEMBRE": 0.95, "OCTUBRE": 1.0, "NOVIEMBRE": 1.05, "DICIEMBRE": 1.0
     }
     
+    # Umbrales de fertilidad (ascendentes) y etiquetas de cada tramo
+    _FERT_THRESH = np.array([0.25, 0.40, 0.55, 0.70, 0.85])
+    _FERT_CAT = np.array(["MUY BAJA", "BAJA", "MEDIA", "ALTA", "MUY ALTA", "EXCELENTE"])
+    _FERT_PRI = np.array(["URGENTE", "ALTA", "MEDIA-ALTA", "MEDIA", "MEDIA-BAJA", "BAJA"])
+    
+    # Zonas a partir de las cuales compensa evaluar con numexpr
+    _NUMEXPR_MIN_ROWS = 10_000
+    
+    # Tipo de las columnas numéricas de salida de analyze_zones
+    OUTPUT_DTYPE = np.float32
+    
     def __init__(self, crop_type: str, analysis_month: str):
         """
         Inicializar analizador.
@@ -83,6 +253,23 @@ class SoilAnalyzer:
         
         if not self.params:
             raise ValueError(f"Cultivo no soportado: {crop_type}")
+        
+        # Factor estacional y potencial base resueltos una sola vez
+        self._month_factor = self.MONTH_FACTORS.get(analysis_month, 1.0)
+        self._base_yield = self.BASE_YIELD.get(crop_type, 20.0)
+        self._base_yield_cap = self._base_yield * 2
+        
+        # Óptimos como floats planos e inversas de normalización (1 / (óptimo * 1.5))
+        self._row = self.CROP_PARAMS_ARR[self.CROP_IDX[crop_type]]
+        self._n_opt = float(self._row[_COL['nitrogeno_optimo']])
+        self._p_opt = float(self._row[_COL['fosforo_optimo']])
+        self._k_opt = float(self._row[_COL['potasio_optimo']])
+        self._om_opt = float(self._row[_COL['materia_organica_optima']])
+        self._ph_opt = float(self._row[_COL['ph_optimo']])
+        self._n_inv = 1.0 / (self._n_opt * 1.5)
+        self._p_inv = 1.0 / (self._p_opt * 1.5)
+        self._k_inv = 1.0 / (self._k_opt * 1.5)
+        self._om_inv = 1.0 / (self._om_opt * 1.5)
     
     def calculate_fertility_index(
         self,
@@ -99,53 +286,33 @@ class SoilAnalyzer:
         Returns:
             Diccionario con índice y categoría
         """
-        try:
-            # Normalizar valores
-            n_norm = self._normalize_value(nitrogen, self.params.nitrogeno_optimo)
-            p_norm = self._normalize_value(phosphorus, self.params.fosforo_optimo)
-            k_norm = self._normalize_value(potassium, self.params.potasio_optimo)
-            om_norm = self._normalize_value(organic_matter, self.params.materia_organica_optima)
-            ph_norm = 1 - abs(ph - self.params.ph_optimo) / 4.0
-            
-            # Aplicar factor estacional
-            month_factor = self.MONTH_FACTORS.get(self.analysis_month, 1.0)
-            
-            # Calcular índice compuesto (pesos ajustables)
-            fertility_index = (
-                n_norm * 0.25 +
-                p_norm * 0.20 +
-                k_norm * 0.20 +
-                om_norm * 0.15 +
-                ph_norm * 0.10 +
-                ndvi * 0.10
-            ) * month_factor
-            
-            fertility_index = np.clip(fertility_index, 0, 1)
-            
-            # Determinar categoría
-            category, priority = self._classify_fertility(fertility_index)
-            
-            return {
-                'index': float(fertility_index),
-                'category': category,
-                'priority': priority,
-                'components': {
-                    'nitrogen': float(n_norm),
-                    'phosphorus': float(p_norm),
-                    'potassium': float(k_norm),
-                    'organic_matter': float(om_norm),
-                    'ph': float(ph_norm)
-                }
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculando índice de fertilidad: {e}")
-            return {
-                'index': 0.5,
-                'category': 'MEDIA',
-                'priority': 'MEDIA',
-                'components': {}
+        # Entradas cuantizadas a 3 decimales para aprovechar la caché
+        fertility_index, n_norm, p_norm, k_norm, om_norm, ph_norm = self._fertility_cached(
+            round(float(nitrogen), 3),
+            round(float(phosphorus), 3),
+            round(float(potassium), 3),
+            round(float(organic_matter), 3),
+            round(float(ph), 3),
+            round(float(ndvi), 3),
+            self.crop_type,
+            self.analysis_month
+        )
+        
+        # Determinar categoría
+        category, priority = self._classify_fertility(fertility_index)
+        
+        return {
+            'index': fertility_index,
+            'category': category,
+            'priority': priority,
+            'components': {
+                'nitrogen': n_norm,
+                'phosphorus': p_norm,
+                'potassium': k_norm,
+                'organic_matter': om_norm,
+                'ph': ph_norm
             }
+        }
     
     def calculate_npk_recommendations(
         self,
@@ -164,43 +331,25 @@ class SoilAnalyzer:
         """
         recommendations = {}
         
-        # Nitrógeno
-        n_deficit = max(0, self.params.nitrogeno_optimo - nitrogen)
-        n_efficiency = 1.4
-        n_growth = 1.2
-        n_om_factor = max(0.7, 1.0 - (organic_matter / 15.0))
-        n_ndvi_factor = 1.0 + (0.5 - ndvi) * 0.4
-        n_recommendation = n_deficit * n_efficiency * n_growth * n_om_factor * n_ndvi_factor
-        n_recommendation = np.clip(n_recommendation, 20, 250)
-        
-        # Fósforo
-        p_deficit = max(0, self.params.fosforo_optimo - phosphorus)
-        p_efficiency = 1.6
-        p_ph_factor = 1.3 if ph < 5.5 or ph > 7.5 else 1.0
-        p_recommendation = p_deficit * p_efficiency * p_ph_factor
-        p_recommendation = np.clip(p_recommendation, 10, 120)
-        
-        # Potasio
-        k_deficit = max(0, self.params.potasio_optimo - potassium)
-        k_efficiency = 1.3
-        k_texture_factor = 1.2 if organic_matter < 2.0 else 1.0
-        k_yield_factor = 1.0 + (0.5 - ndvi) * 0.3
-        k_recommendation = k_deficit * k_efficiency * k_texture_factor * k_yield_factor
-        k_recommendation = np.clip(k_recommendation, 15, 200)
+        n_deficit, n_recommendation, p_deficit, p_recommendation, k_deficit, k_recommendation = _npk_core(
+            float(nitrogen), float(phosphorus), float(potassium),
+            float(ndvi), float(organic_matter), float(ph),
+            self._n_opt, self._p_opt, self._k_opt
+        )
         
         recommendations['nitrogen'] = {
-            'deficit': float(n_deficit),
-            'recommendation': float(n_recommendation),
+            'deficit': n_deficit,
+            'recommendation': n_recommendation,
             'unit': 'kg/ha N'
         }
         recommendations['phosphorus'] = {
-            'deficit': float(p_deficit),
-            'recommendation': float(p_recommendation),
+            'deficit': p_deficit,
+            'recommendation': p_recommendation,
             'unit': 'kg/ha P₂O₅'
         }
         recommendations['potassium'] = {
-            'deficit': float(k_deficit),
-            'recommendation': float(k_recommendation),
+            'deficit': k_deficit,
+            'recommendation': k_recommendation,
             'unit': 'kg/ha K₂O'
         }
         
@@ -208,54 +357,87 @@ class SoilAnalyzer:
     
     def calculate_yield_potential(
         self,
-        fertility_index: float,
-        solar_radiation: float,
-        precipitation: float,
-        wind_speed: float,
-        ndvi: float,
-        temperature: float = 25.0
-    ) -> float:
+        fertility_index,
+        solar_radiation,
+        precipitation,
+        wind_speed,
+        ndvi,
+        temperature=25.0
+    ):
         """
         Calcular potencial de cosecha.
         
+        Acepta escalares o arreglos (por zona); los arreglos se procesan en
+        una sola pasada vectorizada.
+        
         Returns:
-            Potencial en toneladas por hectárea
+            Potencial en toneladas por hectárea (float o np.ndarray)
         """
-        try:
-            # Factores de ajuste
-            rad_factor = np.clip(solar_radiation / 20.0, 0.5, 1.2)
-            water_factor = np.clip(precipitation / 6.0, 0.3, 1.5)
-            wind_factor = np.clip(1.0 - (wind_speed - 2.0) / 10.0, 0.7, 1.0)
-            temp_factor = 1.0 - abs(temperature - 25.0) / 20.0
-            ndvi_factor = np.clip(ndvi / 0.8, 0.5, 1.2)
-            
-            # Potencial base según cultivo
-            base_yield = {
-                'PALMA_ACEITERA': 25.0,
-                'CACAO': 1.5,
-                'BANANO': 40.0
-            }.get(self.crop_type, 20.0)
-            
-            # Calcular potencial
-            yield_potential = (
-                base_yield *
-                fertility_index *
-                rad_factor *
-                water_factor *
-                wind_factor *
-                temp_factor *
-                ndvi_factor
+        args = (fertility_index, solar_radiation, precipitation, wind_speed, ndvi, temperature)
+        if all(np.ndim(arg) == 0 for arg in args):
+            return _yield_core(
+                float(fertility_index), float(solar_radiation), float(precipitation),
+                float(wind_speed), float(ndvi), float(temperature),
+                self._base_yield, self._base_yield_cap
             )
-            
-            return float(np.clip(yield_potential, 0, base_yield * 2))
-            
-        except Exception as e:
-            logger.error(f"Error calculando potencial de cosecha: {e}")
-            return 0.0
+        
+        rad_factor = np.clip(np.divide(solar_radiation, 20.0), 0.5, 1.2)
+        water_factor = np.clip(np.divide(precipitation, 6.0), 0.3, 1.5)
+        wind_factor = np.clip(1.0 - (np.subtract(wind_speed, 2.0)) / 10.0, 0.7, 1.0)
+        temp_factor = 1.0 - np.abs(np.subtract(temperature, 25.0)) / 20.0
+        ndvi_factor = np.clip(np.divide(ndvi, 0.8), 0.5, 1.2)
+        
+        yield_potential = (
+            self._base_yield *
+            np.asarray(fertility_index, dtype=np.float64) *
+            rad_factor *
+            water_factor *
+            wind_factor *
+            temp_factor *
+            ndvi_factor
+        )
+        
+        return np.clip(yield_potential, 0.0, self._base_yield_cap)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _fertility_cached(
+        nitrogen: float,
+        phosphorus: float,
+        potassium: float,
+        organic_matter: float,
+        ph: float,
+        ndvi: float,
+        crop_type: str,
+        analysis_month: str
+    ) -> Tuple[float, ...]:
+        """
+        Índice de fertilidad memoizado.
+        
+        La clave incluye cultivo y mes (no la instancia), de modo que la caché
+        se comparte entre analizadores con la misma configuración.
+        """
+        # tolist() devuelve floats nativos: sin escalares np.float64 en la ruta escalar
+        row = SoilAnalyzer.CROP_PARAMS_ARR[SoilAnalyzer.CROP_IDX[crop_type]].tolist()
+        return _fertility_core(
+            nitrogen, phosphorus, potassium, organic_matter, ph, ndvi,
+            1.0 / (row[_COL['nitrogeno_optimo']] * 1.5),
+            1.0 / (row[_COL['fosforo_optimo']] * 1.5),
+            1.0 / (row[_COL['potasio_optimo']] * 1.5),
+            1.0 / (row[_COL['materia_organica_optima']] * 1.5),
+            row[_COL['ph_optimo']],
+            SoilAnalyzer.MONTH_FACTORS.get(analysis_month, 1.0)
+        )
     
-    def _normalize_value(self, value: float, optimal: float) -> float:
-        """Normalizar valor respecto al óptimo."""
-        return np.clip(value / (optimal * 1.5), 0, 1)
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, int]:
+        """Estadísticas de la caché del índice de fertilidad (hits, misses, ...)."""
+        return cls._fertility_cached.cache_info()._asdict()
+    
+    @staticmethod
+    def _normalize_value(value: np.ndarray, inv: float) -> np.ndarray:
+        """Normalizar valor respecto al óptimo (inv = 1 / (óptimo * 1.5))."""
+        return np.clip(value * inv, 0, 1)
     
     def _classify_fertility(self, index: float) -> Tuple[str, str]:
         """Clasificar índice de fertilidad."""
@@ -276,84 +458,220 @@ class SoilAnalyzer:
         self,
         gdf: gpd.GeoDataFrame,
         n_zones: int = 16,
-        seed: int = 42
+        seed: int = 42,
+        climate_data: Optional[Any] = None
     ) -> gpd.GeoDataFrame:
         """
         Analizar parcelas divididas en zonas.
         
+        Args:
+            climate_data: Datos climáticos (ClimateData); si se indican se agrega
+                la columna rendimiento_potencial
+        
         Returns:
             GeoDataFrame con análisis por zona
         """
         try:
-            # Copiar GeoDataFrame
-            result_gdf = gdf.copy()
-            
-            # Generar datos sintéticos (en producción usar datos reales)
-            np.random.seed(seed)
-            n_rows = len(result_gdf)
-            
-            # Generar valores aleatorios pero consistentes
-            for idx in range(n_rows):
-                # Coordenadas para semilla única
-                if hasattr(result_gdf.iloc[idx].geometry, 'centroid'):
-                    centroid = result_gdf.iloc[idx].geometry.centroid
-                    zone_seed = int(abs(hash(f"{centroid.x}_{centroid.y}"))) % 10000
-                    np.random.seed(zone_seed)
-                
-                # Generar datos de suelo
-                result_gdf.loc[idx, 'nitrogeno'] = np.random.normal(
-                    self.params.nitrogeno_optimo * 0.9,
-                    self.params.nitrogeno_optimo * 0.15
-                )
-                result_gdf.loc[idx, 'fosforo'] = np.random.normal(
-                    self.params.fosforo_optimo * 0.9,
-                    self.params.fosforo_optimo * 0.2
-                )
-                result_gdf.loc[idx, 'potasio'] = np.random.normal(
-                    self.params.potasio_optimo * 0.9,
-                    self.params.potasio_optimo * 0.18
-                )
-                result_gdf.loc[idx, 'materia_organica'] = np.random.normal(
-                    self.params.materia_organica_optima,
-                    1.0
-                )
-                result_gdf.loc[idx, 'ph'] = np.random.normal(
-                    self.params.ph_optimo,
-                    0.5
-                )
-                result_gdf.loc[idx, 'ndvi'] = np.random.uniform(0.4, 0.8)
+            # Centroides de todas las zonas en una sola pasada de GEOS
+            # (solo se usan como clave de ubicación, no requieren CRS proyectado)
+            centers = shapely.centroid(np.asarray(gdf.geometry.values))
+            centroids = pd.DataFrame(
+                {'x': shapely.get_x(centers), 'y': shapely.get_y(centers)},
+                index=gdf.index
+            )
             
-            # Calcular índices para cada zona
-            for idx in range(n_rows):
-                fertility_result = self.calculate_fertility_index(
-                    nitrogen=result_gdf.loc[idx, 'nitrogeno'],
-                    phosphorus=result_gdf.loc[idx, 'fosforo'],
-                    potassium=result_gdf.loc[idx, 'potasio'],
-                    organic_matter=result_gdf.loc[idx, 'materia_organica'],
-                    ph=result_gdf.loc[idx, 'ph'],
-                    ndvi=result_gdf.loc[idx, 'ndvi']
-                )
-                
-                result_gdf.loc[idx, 'indice_fertilidad'] = fertility_result['index']
-                result_gdf.loc[idx, 'categoria'] = fertility_result['category']
-                result_gdf.loc[idx, 'prioridad'] = fertility_result['priority']
-                
-                # Calcular recomendaciones
-                recommendations = self.calculate_npk_recommendations(
-                    nitrogen=result_gdf.loc[idx, 'nitrogeno'],
-                    phosphorus=result_gdf.loc[idx, 'fosforo'],
-                    potassium=result_gdf.loc[idx, 'potasio'],
-                    ndvi=result_gdf.loc[idx, 'ndvi'],
-                    organic_matter=result_gdf.loc[idx, 'materia_organica'],
-                    ph=result_gdf.loc[idx, 'ph']
-                )
-                
-                result_gdf.loc[idx, 'recomendacion_n'] = recommendations['nitrogen']['recommendation']
-                result_gdf.loc[idx, 'recomendacion_p'] = recommendations['phosphorus']['recommendation']
-                result_gdf.loc[idx, 'recomendacion_k'] = recommendations['potassium']['recommendation']
+            # Fase numérica sobre un DataFrame plano, sin columna de geometría
+            numeric = self.analyze_zones_df(centroids, seed=seed, climate_data=climate_data)
             
-            return result_gdf
+            # Todas las columnas nuevas en una sola operación, sobre una copia
+            # superficial (sin inserciones columna a columna)
+            return gdf.copy(deep=False).join(numeric)
             
         except Exception as e:
             logger.error(f"Error en análisis de zonas: {e}")
             raise
+    
+    def analyze_zones_df(
+        self,
+        centroids: pd.DataFrame,
+        seed: int = 42,
+        climate_data: Optional[Any] = None
+    ) -> pd.DataFrame:
+        """
+        Fase numérica de analyze_zones sobre un DataFrame plano de centroides.
+        
+        Args:
+            centroids: DataFrame con columnas x, y (una fila por zona)
+            seed: Semilla base de los datos sintéticos
+            climate_data: Datos climáticos (ClimateData) para rendimiento_potencial
+            
+        Returns:
+            DataFrame con las columnas de análisis, indexado como centroids
+        """
+        n_rows = len(centroids)
+        cx = centroids['x'].to_numpy(dtype=np.float64)
+        cy = centroids['y'].to_numpy(dtype=np.float64)
+        
+        # Semilla dependiente de la ubicación de las zonas (hash vectorizado)
+        zone_seeds = (cx.view(np.uint64) ^ cy.view(np.uint64)) % 10000
+        
+        # Generar datos sintéticos en lote (en producción usar datos reales)
+        rng = np.random.default_rng([seed, *zone_seeds.tolist()])
+        nitrogen = rng.normal(
+            self._n_opt * 0.9,
+            self._n_opt * 0.15,
+            n_rows
+        )
+        phosphorus = rng.normal(
+            self._p_opt * 0.9,
+            self._p_opt * 0.2,
+            n_rows
+        )
+        potassium = rng.normal(
+            self._k_opt * 0.9,
+            self._k_opt * 0.18,
+            n_rows
+        )
+        organic_matter = rng.normal(self._om_opt, 1.0, n_rows)
+        ph = rng.normal(self._ph_opt, 0.5, n_rows)
+        ndvi = rng.uniform(0.4, 0.8, n_rows)
+        
+        self._validate_inputs(
+            nitrogeno=nitrogen,
+            fosforo=phosphorus,
+            potasio=potassium,
+            materia_organica=organic_matter,
+            ph=ph,
+            ndvi=ndvi
+        )
+        
+        # Calcular índices y recomendaciones para todas las zonas a la vez
+        if NUMBA_AVAILABLE:
+            fertility_index, tier, rec_n, rec_p, rec_k = _zones_core(
+                nitrogen, phosphorus, potassium, organic_matter, ph, ndvi,
+                self._n_opt, self._p_opt, self._k_opt,
+                self._om_opt, self._ph_opt, self._month_factor,
+                self._FERT_THRESH
+            )
+            category, priority = self._fertility_labels(tier)
+        else:
+            fertility_index, rec_n, rec_p, rec_k = self._zones_batch(
+                nitrogen, phosphorus, potassium, organic_matter, ph, ndvi
+            )
+            category, priority = self._classify_fertility_batch(fertility_index)
+        
+        new_columns = {
+            'nitrogeno': nitrogen,
+            'fosforo': phosphorus,
+            'potasio': potassium,
+            'materia_organica': organic_matter,
+            'ph': ph,
+            'ndvi': ndvi,
+            'indice_fertilidad': fertility_index,
+            'categoria': category,
+            'prioridad': priority,
+            'recomendacion_n': rec_n,
+            'recomendacion_p': rec_p,
+            'recomendacion_k': rec_k
+        }
+        if climate_data is not None:
+            new_columns['rendimiento_potencial'] = self.calculate_yield_potential(
+                fertility_index,
+                climate_data.solar_radiation,
+                climate_data.precipitation,
+                climate_data.wind_speed,
+                ndvi,
+                climate_data.temperature
+            )
+        
+        # Resultados numéricos en float32: el cálculo se hace en float64 y la
+        # precisión de 7 cifras sobra para mapas, gráficos y exportación
+        return pd.DataFrame(
+            {
+                name: values.astype(self.OUTPUT_DTYPE, copy=False) if values.dtype.kind == 'f' else values
+                for name, values in new_columns.items()
+            },
+            index=centroids.index
+        )
+    
+    @staticmethod
+    def _validate_inputs(**arrays: np.ndarray) -> None:
+        """Verificar una sola vez que las columnas de entrada sean finitas."""
+        invalid = [name for name, values in arrays.items() if not np.isfinite(values).all()]
+        if invalid:
+            raise ValueError(f"Valores no finitos en: {', '.join(invalid)}")
+    
+    def _zones_batch(
+        self,
+        nitrogen: np.ndarray,
+        phosphorus: np.ndarray,
+        potassium: np.ndarray,
+        organic_matter: np.ndarray,
+        ph: np.ndarray,
+        ndvi: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Versión NumPy de _zones_core (sin Numba).
+        
+        Calcula índice de fertilidad y dosis NPK en una sola pasada sobre las
+        columnas generadas, sin materializar resultados intermedios por zona.
+        
+        Returns:
+            (indice_fertilidad, recomendacion_n, recomendacion_p, recomendacion_k)
+        """
+        # Índice de fertilidad
+        n_norm = self._normalize_value(nitrogen, self._n_inv)
+        p_norm = self._normalize_value(phosphorus, self._p_inv)
+        k_norm = self._normalize_value(potassium, self._k_inv)
+        om_norm = self._normalize_value(organic_matter, self._om_inv)
+        ph_norm = 1 - np.abs(ph - self._ph_opt) / 4.0
+        
+        if ne is not None and len(ndvi) >= self._NUMEXPR_MIN_ROWS:
+            # Expresión fusionada en una sola pasada, sin arreglos temporales
+            fertility_index = ne.evaluate(
+                "(n * 0.25 + p * 0.20 + k * 0.20 + om * 0.15 + ph_n * 0.10 + ndvi * 0.10) * mf",
+                local_dict={
+                    'n': n_norm, 'p': p_norm, 'k': k_norm, 'om': om_norm,
+                    'ph_n': ph_norm, 'ndvi': ndvi, 'mf': self._month_factor
+                }
+            )
+        else:
+            fertility_index = (
+                n_norm * 0.25 +
+                p_norm * 0.20 +
+                k_norm * 0.20 +
+                om_norm * 0.15 +
+                ph_norm * 0.10 +
+                ndvi * 0.10
+            ) * self._month_factor
+        np.clip(fertility_index, 0, 1, out=fertility_index)
+        
+        # Nitrógeno
+        n_deficit = np.maximum(0, self._n_opt - nitrogen)
+        n_om_factor = np.maximum(0.7, 1.0 - (organic_matter / 15.0))
+        n_ndvi_factor = 1.0 + (0.5 - ndvi) * 0.4
+        n_recommendation = np.clip(n_deficit * 1.4 * 1.2 * n_om_factor * n_ndvi_factor, 20, 250)
+        
+        # Fósforo
+        p_deficit = np.maximum(0, self._p_opt - phosphorus)
+        p_ph_factor = np.where((ph < 5.5) | (ph > 7.5), 1.3, 1.0)
+        p_recommendation = np.clip(p_deficit * 1.6 * p_ph_factor, 10, 120)
+        
+        # Potasio
+        k_deficit = np.maximum(0, self._k_opt - potassium)
+        k_texture_factor = np.where(organic_matter < 2.0, 1.2, 1.0)
+        k_yield_factor = 1.0 + (0.5 - ndvi) * 0.3
+        k_recommendation = np.clip(k_deficit * 1.3 * k_texture_factor * k_yield_factor, 15, 200)
+        
+        return fertility_index, n_recommendation, p_recommendation, k_recommendation
+    
+    def _classify_fertility_batch(self, index: np.ndarray) -> Tuple[pd.Categorical, pd.Categorical]:
+        """Versión vectorizada de _classify_fertility."""
+        tier = np.searchsorted(self._FERT_THRESH, index, side='right')
+        return self._fertility_labels(tier)
+    
+    def _fertility_labels(self, tier: np.ndarray) -> Tuple[pd.Categorical, pd.Categorical]:
+        """Códigos de tramo a categoría y prioridad (Categorical: sin cadenas repetidas por zona)."""
+        category = pd.Categorical.from_codes(tier, categories=self._FERT_CAT)
+        priority = pd.Categorical.from_codes(tier, categories=self._FERT_PRI)
+        return category, priority
@@ -1,16 +1,103 @@
 # app/core/climate.py
+import os
+import io
+import json
+import math
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import asyncio
 import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+try:
+    # Parser JSON más rápido para las respuestas de NASA POWER (opcional)
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# Nombres de mes (1 = ENERO) y su tabla inversa, creados una sola vez
+_NUM_TO_MONTH = (
+    "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
+    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
+)
+_MONTH_TO_NUM = MappingProxyType({name: i for i, name in enumerate(_NUM_TO_MONTH, start=1)})
+
+# Indicadores climáticos: umbrales (bajo, alto) y estado de cada tramo
+_STATUS_BY_BUCKET = ('BAJA', 'ÓPTIMA', 'ALTA')
+_WATER_STATUS_BY_BUCKET = ('DÉFICIT', 'BALANCEADO', 'EXCESO')
+_SOLAR_BINS = (12.0, 22.0)
+_PRECIP_BINS = MappingProxyType({'PALMA_ACEITERA': (100.0, 300.0)})  # mm/mes
+_PRECIP_BINS_DEFAULT = (80.0, 250.0)
+_TEMP_BINS = (18.0, 32.0)
+_WATER_BINS = (-2.0, 2.0)
+
+# Textos de indicadores y recomendaciones (de solo lectura, compartidos entre llamadas)
+_SOLAR_IND = MappingProxyType({
+    'BAJA': MappingProxyType({
+        'status': 'BAJA',
+        'description': 'Radiación insuficiente para crecimiento óptimo',
+        'recommendation': 'Considerar cultivos de sombra o adaptados'
+    }),
+    'ALTA': MappingProxyType({
+        'status': 'ALTA',
+        'description': 'Radiación excesiva puede causar estrés',
+        'recommendation': 'Implementar sombreado o riego adicional'
+    }),
+    'ÓPTIMA': MappingProxyType({
+        'status': 'ÓPTIMA',
+        'description': 'Radiación adecuada para el cultivo',
+        'recommendation': 'Mantener prácticas actuales'
+    })
+})
+_PRECIP_REC = MappingProxyType({
+    'BAJA': MappingProxyType({
+        'PALMA_ACEITERA': 'Implementar riego suplementario, uso de mulch',
+        'CACAO': 'Riego por goteo, sombreado para reducir evaporación',
+        'BANANO': 'Riego frecuente, cubiertas vegetales'
+    }),
+    'ALTA': MappingProxyType({
+        'PALMA_ACEITERA': 'Mejorar drenaje, control de enfermedades fúngicas',
+        'CACAO': 'Drenaje adecuado, poda para mejorar circulación de aire',
+        'BANANO': 'Canales de drenaje, manejo integrado de plagas'
+    }),
+    'ÓPTIMA': 'Mantener prácticas actuales, monitorear regularmente'
+})
+_TEMP_REC = MappingProxyType({
+    'BAJA': 'Usar cubiertas, seleccionar variedades tolerantes al frío',
+    'ALTA': 'Implementar sombreado, riego en horas frescas',
+    'ÓPTIMA': 'Condiciones ideales para crecimiento'
+})
+_WATER_REC = MappingProxyType({
+    'DÉFICIT': 'Aumentar riego, reducir densidad de siembra',
+    'EXCESO': 'Mejorar drenaje, evitar laboreo en suelo húmedo',
+    'BALANCEADO': 'Condiciones óptimas de humedad'
+})
+
+_STATUS_ARRAY = np.array(_STATUS_BY_BUCKET)
+_WATER_STATUS_ARRAY = np.array(_WATER_STATUS_BY_BUCKET)
+
+def _bucket(value: float, low: float, high: float) -> int:
+    """Tramo de un valor: 0 (< low), 1 (entre umbrales o NaN) o 2 (> high)."""
+    # "not <" en lugar de ">=": NaN cae en el tramo central, como la cadena
+    # if/elif/else original. int() explícito: con escalares NumPy, bool + bool
+    # es un OR lógico
+    return int(not value < low) + int(value > high)
+
+def _bucket_codes(values: np.ndarray, low, high) -> np.ndarray:
+    """Versión vectorizada de _bucket (umbrales escalares o por elemento)."""
+    return (~(values < low)).astype(np.intp) + (values > high)
+
 @dataclass
 class ClimateData:
     """Estructura para datos climáticos."""
@@ -26,22 +113,96 @@ class ClimateAnalyzer:
     
     NASA_POWER_BASE_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Campos de ClimateData y parámetro NASA POWER correspondiente
+    POWER_PARAMETERS = {
+        'solar_radiation': 'ALLSKY_SFC_SW_DWN',
+        'precipitation': 'PRECTOTCORR',
+        'temperature': 'T2M',
+        'wind_speed': 'WS10M',
+        'humidity': 'RH2M',
+        'eto': 'ETO'
+    }
+    _ALL_PARAMETERS = ",".join(POWER_PARAMETERS.values())
+    
+    # Parámetros fijos de toda consulta
+    _BASE_PARAMS = MappingProxyType({"community": "ag"})
+    
+    # Peticiones concurrentes en consultas por lote (y tamaño del pool HTTP)
+    MAX_WORKERS = 16
+    
+    # Fin del bloque de cabecera en las respuestas CSV
+    CSV_HEADER_END = "-END HEADER-"
+    
+    # Vigencia en caché de rangos que incluyen días recientes (segundos)
+    CURRENT_CACHE_TTL = 24 * 3600
+    
+    # Entradas máximas de la caché en disco (se eliminan las de uso más antiguo)
+    CACHE_MAX_ENTRIES = 2048
+    
+    # Límite de espera por petición (conexión, lectura) en segundos
+    REQUEST_TIMEOUT = (5, 30)
+    
+    # Reintentos con espera exponencial ante fallos de red o respuestas 429/5xx
+    REQUEST_RETRIES = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"})
+    )
+    
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None):
         """
         Inicializar analizador climático.
         
         Args:
             api_key: Clave API de NASA POWER (opcional)
+            cache_dir: Directorio de caché de datos históricos ("" para desactivar)
         """
         self.api_key = api_key
+        self.cache_dir = cache_dir if cache_dir is not None else os.getenv(
+            'CLIMATE_CACHE_DIR', 'data/cache/power'
+        )
         self.session = requests.Session()
-        self.session.timeout = 30
         
+        # Parámetros comunes (incluida la clave API) resueltos una sola vez
+        self._base_params = MappingProxyType(
+            {**self._BASE_PARAMS, "api_key": api_key} if api_key else self._BASE_PARAMS
+        )
+        
+        # Año de referencia fijo durante la vida del analizador (claves de caché estables)
+        self._current_year = datetime.now().year
+        
+        # Pool de conexiones reutilizable (evita un handshake TLS por petición)
+        adapter = HTTPAdapter(
+            pool_connections=self.MAX_WORKERS,
+            pool_maxsize=self.MAX_WORKERS,
+            max_retries=self.REQUEST_RETRIES
+        )
+        self.session.mount('https://', adapter)
+        
+        # Sesión aiohttp persistente, creada al primer uso asíncrono
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        self._aio_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+    async def __aenter__(self) -> "ClimateAnalyzer":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Cerrar la sesión aiohttp persistente."""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+        self._aio_loop = None
+    
     def get_current_climate(
         self,
         lat: float,
         lon: float,
-        month: str
+        month: str,
+        params_needed: Optional[Sequence[str]] = None
     ) -> ClimateData:
         """
         Obtener datos climáticos actuales para un mes específico.
@@ -50,6 +211,8 @@ class ClimateAnalyzer:
             lat: Latitud
             lon: Longitud
             month: Mes (ENERO, FEBRERO, etc.)
+            params_needed: Campos de ClimateData a consultar (None = todos);
+                los no consultados toman el valor por defecto
             
         Returns:
             Datos climáticos promediados para el mes
@@ -57,7 +220,7 @@ class ClimateAnalyzer:
         try:
             # Convertir mes a número
             month_num = self._month_to_number(month)
-            current_year = datetime.now().year
+            current_year = self._current_year
             
             # Crear rango de fechas para el mes
             start_date = f"{current_year}{month_num:02d}01"
@@ -66,50 +229,55 @@ class ClimateAnalyzer:
             else:
                 end_date = f"{current_year}{month_num + 1:02d}01"
             
-            # Parámetros de la API
-            params = {
-                "parameters": "ALLSKY_SFC_SW_DWN,PRECTOTCORR,T2M,WS10M,RH2M,ETO",
-                "community": "ag",
-                "longitude": lon,
-                "latitude": lat,
-                "start": start_date,
-                "end": end_date,
-                "format": "json"
-            }
+            cache_path = self._climate_cache_path(lat, lon, start_date, end_date, params_needed)
+            cached = self._read_cache(cache_path, self._climate_cache_ttl(end_date))
+            if cached is not None:
+                return ClimateData(**cached)
             
-            if self.api_key:
-                params["api_key"] = self.api_key
+            data = self._request_power(lat, lon, start_date, end_date, params_needed)
+            climate = self._parse_climate_data(data)
             
-            # Hacer petición
-            response = self.session.get(self.NASA_POWER_BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Procesar datos
-            parameters = data['properties']['parameter']
+            if cache_path:
+                self._write_cache(cache_path, asdict(climate))
             
-            # Calcular promedios
-            solar_rad = np.mean(list(parameters['ALLSKY_SFC_SW_DWN'].values()))
-            precip = np.mean(list(parameters['PRECTOTCORR'].values()))
-            temp = np.mean(list(parameters['T2M'].values()))
-            wind = np.mean(list(parameters['WS10M'].values()))
-            humidity = np.mean(list(parameters['RH2M'].values()))
-            eto = np.mean(list(parameters['ETO'].values()))
+            return climate
             
-            return ClimateData(
-                solar_radiation=float(solar_rad),
-                precipitation=float(precip),
-                temperature=float(temp),
-                wind_speed=float(wind),
-                humidity=float(humidity),
-                eto=float(eto)
-            )
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo datos climáticos: {e}")
+        except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+            logger.error("Error obteniendo datos climáticos: %s", e)
             # Retornar valores por defecto
             return self._get_default_climate_data()
     
+    def get_current_climate_batch(
+        self,
+        coords: List[Tuple[float, float]],
+        month: str
+    ) -> List[ClimateData]:
+        """
+        Obtener datos climáticos para varias ubicaciones en paralelo.
+        
+        Args:
+            coords: Lista de (lat, lon)
+            month: Mes (ENERO, FEBRERO, etc.)
+            
+        Returns:
+            Datos climáticos alineados con coords
+        """
+        # Ubicaciones a ~1 km comparten la misma petición
+        keys = [(round(lat, 2), round(lon, 2)) for lat, lon in coords]
+        unique_keys = list(dict.fromkeys(keys))
+        
+        if not unique_keys:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(unique_keys))) as executor:
+            results = executor.map(
+                lambda key: self.get_current_climate(key[0], key[1], month),
+                unique_keys
+            )
+            by_key = dict(zip(unique_keys, results))
+        
+        return [by_key[key] for key in keys]
+    
     def get_historical_climate(
         self,
         lat: float,
@@ -128,50 +296,38 @@ class ClimateAnalyzer:
             Diccionario con datos mensuales promediados
         """
         try:
-            current_year = datetime.now().year
-            historical_data = {
-                'solar_radiation': [[] for _ in range(12)],
-                'precipitation': [[] for _ in range(12)],
-                'temperature': [[] for _ in range(12)],
-                'wind_speed': [[] for _ in range(12)],
-                'humidity': [[] for _ in range(12)],
-                'eto': [[] for _ in range(12)]
-            }
+            current_year = self._current_year
             
-            # Recorrer años
-            for year in range(current_year - years, current_year):
-                for month in range(1, 13):
-                    try:
-                        month_data = self._get_monthly_data(lat, lon, year, month)
-                        
-                        # Agregar a listas por mes
-                        idx = month - 1
-                        historical_data['solar_radiation'][idx].append(month_data.solar_radiation)
-                        historical_data['precipitation'][idx].append(month_data.precipitation)
-                        historical_data['temperature'][idx].append(month_data.temperature)
-                        historical_data['wind_speed'][idx].append(month_data.wind_speed)
-                        historical_data['humidity'][idx].append(month_data.humidity)
-                        historical_data['eto'][idx].append(month_data.eto)
-                        
-                    except Exception as e:
-                        logger.warning(f"Error mes {month}/{year}: {e}")
-                        continue
+            cache_path = self._historical_cache_path(lat, lon, current_year - years, current_year - 1)
+            cached = self._read_cache(cache_path)
+            if cached is not None:
+                return cached
             
-            # Calcular promedios por mes
-            result = {}
-            for key in historical_data:
-                monthly_averages = []
-                for month_data in historical_data[key]:
-                    if month_data:
-                        monthly_averages.append(float(np.mean(month_data)))
-                    else:
-                        monthly_averages.append(0.0)
-                result[key] = monthly_averages
+            # Una sola petición CSV para todo el rango; se agrupa por mes localmente
+            try:
+                daily = self._request_power_csv(
+                    lat, lon,
+                    f"{current_year - years}0101",
+                    f"{current_year - 1}1231"
+                )
+                result = self._monthly_means(daily)
+                failed_years = 0
+            except requests.RequestException as e:
+                # Respaldo: un rango anual por petición, en paralelo
+                logger.warning("Rango completo no disponible (%s); consultando por año", e)
+                result, failed_years = asyncio.run(
+                    self._historical_by_year_async(lat, lon, current_year - years, current_year)
+                )
+            
+            # Los datos históricos no cambian: se persisten descargas completas
+            if cache_path and failed_years == 0:
+                self._write_cache(cache_path, result)
             
             return result
             
-        except Exception as e:
-            logger.error(f"Error obteniendo datos históricos: {e}")
+        except (requests.RequestException, KeyError, ValueError, RuntimeError) as e:
+            # RuntimeError: ningún año disponible en el respaldo por año
+            logger.error("Error obteniendo datos históricos: %s", e)
             return self._get_default_historical_data()
     
     async def get_climate_async(
@@ -194,24 +350,24 @@ class ClimateAnalyzer:
             Datos climáticos o None
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    "parameters": "ALLSKY_SFC_SW_DWN,PRECTOTCORR,T2M,WS10M,RH2M,ETO",
-                    "community": "ag",
-                    "longitude": lon,
-                    "latitude": lat,
-                    "start": start_date,
-                    "end": end_date,
-                    "format": "json"
-                }
-                
-                async with session.get(self.NASA_POWER_BASE_URL, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_climate_data(data)
-        
-        except Exception as e:
-            logger.error(f"Error async obteniendo clima: {e}")
+            cache_path = self._climate_cache_path(lat, lon, start_date, end_date)
+            cached = self._read_cache(cache_path, self._climate_cache_ttl(end_date))
+            if cached is not None:
+                return ClimateData(**cached)
+            
+            session = await self._get_aio_session()
+            params = self._power_params(lat, lon, start_date, end_date)
+            
+            async with session.get(self.NASA_POWER_BASE_URL, params=params) as response:
+                if response.status == 200:
+                    data = _json_loads(await response.read())
+                    climate = self._parse_climate_data(data)
+                    if cache_path:
+                        self._write_cache(cache_path, asdict(climate))
+                    return climate
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, TypeError, ValueError) as e:
+            logger.error("Error async obteniendo clima: %s", e)
             return None
     
     def calculate_climate_indicators(
@@ -227,43 +383,14 @@ class ClimateAnalyzer:
         """
         indicators = {}
         
-        # Indicador de radiación solar
-        if climate_data.solar_radiation < 12:
-            indicators['solar_radiation'] = {
-                'status': 'BAJA',
-                'description': 'Radiación insuficiente para crecimiento óptimo',
-                'recommendation': 'Considerar cultivos de sombra o adaptados'
-            }
-        elif climate_data.solar_radiation > 22:
-            indicators['solar_radiation'] = {
-                'status': 'ALTA',
-                'description': 'Radiación excesiva puede causar estrés',
-                'recommendation': 'Implementar sombreado o riego adicional'
-            }
-        else:
-            indicators['solar_radiation'] = {
-                'status': 'ÓPTIMA',
-                'description': 'Radiación adecuada para el cultivo',
-                'recommendation': 'Mantener prácticas actuales'
-            }
+        # Indicador de radiación solar (copia de la plantilla precalculada)
+        solar_status = _STATUS_BY_BUCKET[_bucket(climate_data.solar_radiation, *_SOLAR_BINS)]
+        indicators['solar_radiation'] = dict(_SOLAR_IND[solar_status])
         
         # Indicador de precipitación
         monthly_precip = climate_data.precipitation * 30
-        
-        if crop_type == 'PALMA_ACEITERA':
-            if monthly_precip < 100:
-                precip_status = 'BAJA'
-            elif monthly_precip > 300:
-                precip_status = 'ALTA'
-            else:
-                precip_status = 'ÓPTIMA'
-        else:
-            if monthly_precip < 80:
-                precip_status = 'BAJA'
-            elif monthly_precip > 250:
-                precip_status = 'ALTA'
-            else:
-                precip_status = 'ÓPTIMA'
+        precip_bins = _PRECIP_BINS.get(crop_type, _PRECIP_BINS_DEFAULT)
+        precip_status = _STATUS_BY_BUCKET[_bucket(monthly_precip, *precip_bins)]
         
         indicators['precipitation'] = {
             'status': precip_status,
@@ -272,12 +399,7 @@ class ClimateAnalyzer:
         }
         
         # Indicador de temperatura
-        if climate_data.temperature < 18:
-            temp_status = 'BAJA'
-        elif climate_data.temperature > 32:
-            temp_status = 'ALTA'
-        else:
-            temp_status = 'ÓPTIMA'
+        temp_status = _STATUS_BY_BUCKET[_bucket(climate_data.temperature, *_TEMP_BINS)]
         
         indicators['temperature'] = {
             'status': temp_status,
@@ -287,12 +409,7 @@ class ClimateAnalyzer:
         
         # Balance hídrico (Precipitación - ETO)
         water_balance = climate_data.precipitation - climate_data.eto
-        if water_balance < -2:
-            water_status = 'DÉFICIT'
-        elif water_balance > 2:
-            water_status = 'EXCESO'
-        else:
-            water_status = 'BALANCEADO'
+        water_status = _WATER_STATUS_BY_BUCKET[_bucket(water_balance, *_WATER_BINS)]
         
         indicators['water_balance'] = {
             'status': water_status,
@@ -302,51 +419,330 @@ class ClimateAnalyzer:
         
         return indicators
     
-    def _get_monthly_data(
+    def calculate_climate_indicators_batch(
+        self,
+        climate_fields: Dict[str, np.ndarray],
+        crop_type
+    ) -> Dict[str, np.ndarray]:
+        """
+        Estado de los indicadores climáticos para muchas ubicaciones a la vez.
+        
+        Args:
+            climate_fields: Arreglos por campo de ClimateData (solar_radiation,
+                precipitation, temperature, eto)
+            crop_type: Cultivo único o arreglo de cultivos por ubicación
+            
+        Returns:
+            Arreglos de estado por indicador
+        """
+        solar = np.asarray(climate_fields['solar_radiation'], dtype=np.float64)
+        precipitation = np.asarray(climate_fields['precipitation'], dtype=np.float64)
+        temperature = np.asarray(climate_fields['temperature'], dtype=np.float64)
+        eto = np.asarray(climate_fields['eto'], dtype=np.float64)
+        
+        # Umbrales de precipitación según el cultivo de cada ubicación
+        crops = np.asarray(crop_type)
+        precip_low, precip_high = _PRECIP_BINS_DEFAULT
+        for crop, (crop_low, crop_high) in _PRECIP_BINS.items():
+            is_crop = crops == crop
+            precip_low = np.where(is_crop, crop_low, precip_low)
+            precip_high = np.where(is_crop, crop_high, precip_high)
+        
+        return {
+            'solar_radiation': _STATUS_ARRAY[_bucket_codes(solar, *_SOLAR_BINS)],
+            'precipitation': _STATUS_ARRAY[_bucket_codes(precipitation * 30, precip_low, precip_high)],
+            'temperature': _STATUS_ARRAY[_bucket_codes(temperature, *_TEMP_BINS)],
+            'water_balance': _WATER_STATUS_ARRAY[_bucket_codes(precipitation - eto, *_WATER_BINS)]
+        }
+    
+    async def _get_aio_session(self) -> aiohttp.ClientSession:
+        """
+        Sesión aiohttp persistente (DNS, TCP y TLS se reutilizan entre llamadas).
+        
+        Una sesión queda ligada a su event loop, por lo que se recrea si el loop
+        cambió (cerrando antes la anterior) o si fue cerrada con aclose().
+        """
+        loop = asyncio.get_running_loop()
+        if self._aio_session is None or self._aio_session.closed or self._aio_loop is not loop:
+            if self._aio_session is not None and not self._aio_session.closed:
+                # El loop anterior puede estar ya cerrado: basta con marcar
+                # conector y sesión como cerrados para liberar sus recursos
+                try:
+                    await self._aio_session.close()
+                except RuntimeError as e:
+                    logger.debug("Sesión aiohttp de un loop cerrado: %s", e)
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.MAX_WORKERS, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+            self._aio_loop = loop
+        return self._aio_session
+    
+    def _power_params(
         self,
         lat: float,
         lon: float,
-        year: int,
-        month: int
-    ) -> ClimateData:
-        """Obtener datos para un mes específico."""
-        start_date = f"{year}{month:02d}01"
-        if month == 12:
-            end_date = f"{year + 1}0101"
+        start_date: str,
+        end_date: str,
+        fields: Optional[Sequence[str]] = None,
+        response_format: str = "json"
+    ) -> Dict:
+        """Parámetros de consulta diaria a NASA POWER (fields: campos de ClimateData)."""
+        if fields:
+            parameters = ",".join(self.POWER_PARAMETERS[field] for field in fields)
         else:
-            end_date = f"{year}{month + 1:02d}01"
+            parameters = self._ALL_PARAMETERS
+        
+        return {
+            **self._base_params,
+            "parameters": parameters,
+            "longitude": lon,
+            "latitude": lat,
+            "start": start_date,
+            "end": end_date,
+            "format": response_format
+        }
+    
+    def _request_power(
+        self,
+        lat: float,
+        lon: float,
+        start_date: str,
+        end_date: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """Petición diaria a NASA POWER (lanza excepción si falla)."""
+        params = self._power_params(lat, lon, start_date, end_date, fields)
+        response = self.session.get(
+            self.NASA_POWER_BASE_URL, params=params, timeout=self.REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        return _json_loads(response.content)
+    
+    def _request_power_csv(
+        self,
+        lat: float,
+        lon: float,
+        start_date: str,
+        end_date: str
+    ) -> pd.DataFrame:
+        """
+        Petición diaria en formato CSV (más compacto que JSON en rangos largos).
         
-        return self.get_current_climate(lat, lon, self._number_to_month(month))
+        Returns:
+            DataFrame con columnas YEAR, MO, DY y una por parámetro
+        """
+        params = self._power_params(lat, lon, start_date, end_date, response_format="csv")
+        response = self.session.get(
+            self.NASA_POWER_BASE_URL, params=params, timeout=self.REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        
+        # Saltar el bloque de cabecera (-BEGIN HEADER- ... -END HEADER-)
+        text = response.text
+        header_end = text.find(self.CSV_HEADER_END)
+        if header_end != -1:
+            text = text[header_end + len(self.CSV_HEADER_END):].lstrip()
+        
+        return pd.read_csv(io.StringIO(text))
+    
+    async def _request_power_async(
+        self,
+        session: aiohttp.ClientSession,
+        lat: float,
+        lon: float,
+        start_date: str,
+        end_date: str
+    ) -> Dict:
+        """Versión asíncrona de _request_power sobre una sesión compartida."""
+        params = self._power_params(lat, lon, start_date, end_date)
+        async with session.get(self.NASA_POWER_BASE_URL, params=params) as response:
+            response.raise_for_status()
+            return _json_loads(await response.read())
+    
+    async def _historical_by_year_async(
+        self,
+        lat: float,
+        lon: float,
+        start_year: int,
+        end_year: int
+    ) -> Tuple[Dict[str, List[float]], int]:
+        """
+        Datos históricos con una petición por año, concurrentes.
+        
+        Returns:
+            (promedios mensuales, número de años fallidos)
+        """
+        semaphore = asyncio.Semaphore(8)
+        session = await self._get_aio_session()
+        
+        async def fetch_year(year: int) -> Dict:
+            async with semaphore:
+                return await self._request_power_async(
+                    session, lat, lon, f"{year}0101", f"{year}1231"
+                )
+        
+        years = range(start_year, end_year)
+        responses = await asyncio.gather(
+            *(fetch_year(year) for year in years),
+            return_exceptions=True
+        )
+        
+        # Series diarias por año (índice YYYYMMDD, una columna por parámetro)
+        frames = []
+        for year, response in zip(years, responses):
+            if isinstance(response, Exception):
+                logger.warning("Error año %s: %s", year, response)
+                continue
+            frames.append(pd.DataFrame(response['properties']['parameter']))
+        
+        if not frames:
+            raise RuntimeError("No se obtuvo ningún año de datos históricos")
+        
+        daily = pd.concat(frames)
+        daily['MO'] = daily.index.str[4:6].astype(int)
+        return self._monthly_means(daily), len(years) - len(frames)
+    
+    def _monthly_means(self, daily: pd.DataFrame) -> Dict[str, List[float]]:
+        """
+        Promedios mensuales de series diarias.
+        
+        Args:
+            daily: DataFrame con columna MO (1-12) y una columna por parámetro
+            
+        Returns:
+            12 promedios por campo de ClimateData; los valores faltantes de
+            NASA POWER (-999) se descartan y los meses sin datos quedan en 0.0
+        """
+        params = list(self.POWER_PARAMETERS.values())
+        values = daily[params].astype(np.float64)
+        monthly = (
+            values.where(values > -900)
+            .groupby(daily['MO'])
+            .mean()
+            .reindex(range(1, 13))
+            .fillna(0.0)
+        )
+        return {key: monthly[param].tolist() for key, param in self.POWER_PARAMETERS.items()}
+    
+    def _historical_cache_path(
+        self,
+        lat: float,
+        lon: float,
+        start_year: int,
+        end_year: int
+    ) -> Optional[str]:
+        """Ruta de caché para datos históricos (celda de 0.5°, resolución de NASA POWER)."""
+        if not self.cache_dir:
+            return None
+        
+        lat_cell = round(lat * 2) / 2
+        lon_cell = round(lon * 2) / 2
+        filename = f"historico_{lat_cell:.1f}_{lon_cell:.1f}_{start_year}_{end_year}.json"
+        return os.path.join(self.cache_dir, filename)
+    
+    def _climate_cache_path(
+        self,
+        lat: float,
+        lon: float,
+        start_date: str,
+        end_date: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[str]:
+        """Ruta de caché para un rango diario (lat/lon redondeados a 3 decimales)."""
+        if not self.cache_dir:
+            return None
+        
+        suffix = f"_{'-'.join(sorted(fields))}" if fields else ""
+        filename = f"clima_{lat:.3f}_{lon:.3f}_{start_date}_{end_date}{suffix}.json"
+        return os.path.join(self.cache_dir, filename)
+    
+    def _climate_cache_ttl(self, end_date: str) -> Optional[float]:
+        """Rangos ya cerrados no expiran; los que llegan a hoy se renuevan a diario."""
+        if end_date < datetime.now().strftime("%Y%m%d"):
+            return None
+        return self.CURRENT_CACHE_TTL
+    
+    def _read_cache(self, cache_path: Optional[str], ttl: Optional[float] = None) -> Optional[Any]:
+        """Leer entrada de caché en disco (None si no existe, expiró o es ilegible)."""
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        
+        try:
+            mtime = os.path.getmtime(cache_path)
+            if ttl is not None and time.time() - mtime > ttl:
+                return None
+            with open(cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+            # Marcar el último uso en atime; mtime sigue midiendo la vigencia
+            os.utime(cache_path, (time.time(), mtime))
+            return data
+        except (OSError, ValueError) as e:
+            logger.warning(f"Caché climática ilegible ({cache_path}): {e}")
+            return None
+    
+    def _write_cache(self, cache_path: str, data: Any) -> None:
+        """Guardar entrada de caché en disco (escritura atómica)."""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar caché climática: {e}")
+            return
+        
+        self._evict_cache(os.path.dirname(cache_path))
+    
+    def _evict_cache(self, cache_dir: str) -> None:
+        """Eliminar las entradas de uso más antiguo por encima de CACHE_MAX_ENTRIES."""
+        try:
+            entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.json')]
+        except OSError as e:
+            logger.warning(f"No se pudo recorrer la caché climática: {e}")
+            return
+        
+        excess = len(entries) - self.CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        
+        entries.sort(key=lambda entry: entry.stat().st_atime)
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                # Otro proceso pudo eliminarla ya
+                pass
     
     def _parse_climate_data(self, data: Dict) -> ClimateData:
         """Parsear respuesta de la API."""
         params = data['properties']['parameter']
         
-        return ClimateData(
-            solar_radiation=float(np.mean(list(params['ALLSKY_SFC_SW_DWN'].values()))),
-            precipitation=float(np.mean(list(params['PRECTOTCORR'].values()))),
-            temperature=float(np.mean(list(params['T2M'].values()))),
-            wind_speed=float(np.mean(list(params['WS10M'].values()))),
-            humidity=float(np.mean(list(params['RH2M'].values()))),
-            eto=float(np.mean(list(params['ETO'].values())))
-        )
+        # Parámetros no consultados conservan el valor por defecto
+        default = self._get_default_climate_data()
+        return ClimateData(**{
+            field: self._mean(params[param]) if param in params else getattr(default, field)
+            for field, param in self.POWER_PARAMETERS.items()
+        })
+    
+    @staticmethod
+    def _mean(daily: Dict[str, float]) -> float:
+        """Promedio de una serie diaria, descartando faltantes de NASA POWER (-999)."""
+        values = daily.values()
+        
+        # Caso común sin faltantes: se suma directamente sobre la vista del dict
+        if values and min(values) > -900:
+            return math.fsum(values) / len(values)
+        
+        valid = [v for v in values if v > -900]
+        if not valid:
+            raise ValueError("Serie climática sin datos válidos")
+        return math.fsum(valid) / len(valid)
     
     def _month_to_number(self, month: str) -> int:
         """Convertir nombre de mes a número."""
-        months = {
-            "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4,
-            "MAYO": 5, "JUNIO": 6, "JULIO": 7, "AGOSTO": 8,
-            "SEPTIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12
-        }
-        return months.get(month.upper(), 1)
-    
-    def _number_to_month(self, number: int) -> str:
-        """Convertir número a nombre de mes."""
-        months = [
-            "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
-            "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
-        ]
-        return months[number - 1] if 1 <= number <= 12 else "ENERO"
+        return _MONTH_TO_NUM.get(month.upper(), 1)
     
     def _get_default_climate_data(self) -> ClimateData:
         """Obtener datos climáticos por defecto."""
@@ -373,37 +769,15 @@ class ClimateAnalyzer:
     
     def _get_precipitation_recommendation(self, status: str, crop_type: str) -> str:
         """Obtener recomendación basada en precipitación."""
-        recommendations = {
-            'BAJA': {
-                'PALMA_ACEITERA': 'Implementar riego suplementario, uso de mulch',
-                'CACAO': 'Riego por goteo, sombreado para reducir evaporación',
-                'BANANO': 'Riego frecuente, cubiertas vegetales'
-            },
-            'ALTA': {
-                'PALMA_ACEITERA': 'Mejorar drenaje, control de enfermedades fúngicas',
-                'CACAO': 'Drenaje adecuado, poda para mejorar circulación de aire',
-                'BANANO': 'Canales de drenaje, manejo integrado de plagas'
-            },
-            'ÓPTIMA': 'Mantener prácticas actuales, monitorear regularmente'
-        }
-        
         if status == 'ÓPTIMA':
-            return recommendations[status]
+            return _PRECIP_REC[status]
         
-        return recommendations[status].get(crop_type, 'Ajustar prácticas de manejo')
+        return _PRECIP_REC[status].get(crop_type, 'Ajustar prácticas de manejo')
     
     def _get_temperature_recommendation(self, status: str) -> str:
         """Obtener recomendación basada en temperatura."""
-        return {
-            'BAJA': 'Usar cubiertas, seleccionar variedades tolerantes al frío',
-            'ALTA': 'Implementar sombreado, riego en horas frescas',
-            'ÓPTIMA': 'Condiciones ideales para crecimiento'
-        }.get(status, 'Monitorear condiciones')
+        return _TEMP_REC.get(status, 'Monitorear condiciones')
     
     def _get_water_recommendation(self, status: str) -> str:
         """Obtener recomendación basada en balance hídrico."""
-        return {
-            'DÉFICIT': 'Aumentar riego, reducir densidad de siembra',
-            'EXCESO': 'Mejorar drenaje, evitar laboreo en suelo húmedo',
-            'BALANCEADO': 'Condiciones óptimas de humedad'
-        }.get(status, 'Ajustar manejo hídrico según necesidad')
+        return _WATER_REC.get(status, 'Ajustar manejo hídrico según necesidad')
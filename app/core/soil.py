@@ -2,13 +2,116 @@
 """
 Módulo para análisis de textura y propiedades físicas del suelo.
 """
+import bisect
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
 import logging
 
+from ._njit import njit, prange, NUMBA_AVAILABLE
+
 logger = logging.getLogger(__name__)
 
+# Clases texturales por código devuelto por _classify_texture_code
+_CLASS_NAMES = (
+    "NO_DETERMINADA",
+    "Arcilloso",
+    "Franco Arcilloso",
+    "Franco",
+    "Franco Arcilloso-Arenoso",
+    "Arenoso"
+)
+_CLASS_CODES = {name: code for code, name in enumerate(_CLASS_NAMES)}
+
+@njit(cache=True, fastmath=True)
+def _classify_texture_code(sand, silt, clay):
+    """Código de clase textural USDA (índice en _CLASS_NAMES)."""
+    total = sand + silt + clay
+    if total == 0:
+        return 0
+    
+    sand_norm = (sand / total) * 100
+    silt_norm = (silt / total) * 100
+    clay_norm = (clay / total) * 100
+    
+    if clay_norm >= 40:
+        return 1
+    if clay_norm >= 27 and 15 <= silt_norm <= 53 and 20 <= sand_norm <= 45:
+        return 2
+    if 7 <= clay_norm <= 27 and 28 <= silt_norm <= 50 and 43 <= sand_norm <= 52:
+        return 3
+    if 70 <= sand_norm <= 85 and clay_norm <= 20:
+        return 4
+    if sand_norm >= 85:
+        return 5
+    return 3
+
+def _classify_texture_codes(sand: np.ndarray, silt: np.ndarray, clay: np.ndarray) -> np.ndarray:
+    """Versión NumPy de _classify_texture_code para arreglos (sin Numba)."""
+    total = sand + silt + clay
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sand_norm = (sand / total) * 100
+        silt_norm = (silt / total) * 100
+        clay_norm = (clay / total) * 100
+    
+    conditions = [
+        total == 0,
+        clay_norm >= 40,
+        (clay_norm >= 27) & (silt_norm >= 15) & (silt_norm <= 53) & (sand_norm >= 20) & (sand_norm <= 45),
+        (clay_norm >= 7) & (clay_norm <= 27) & (silt_norm >= 28) & (silt_norm <= 50) & (sand_norm >= 43) & (sand_norm <= 52),
+        (sand_norm >= 70) & (sand_norm <= 85) & (clay_norm <= 20),
+        sand_norm >= 85
+    ]
+    return np.select(conditions, [0, 1, 2, 3, 4, 5], default=3)
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _texture_batch_core(sand, silt, clay, score_table):
+    """Código de clase textural y puntaje de adecuación (score_table[código]) por muestra."""
+    n_rows = sand.shape[0]
+    codes = np.empty(n_rows, dtype=np.int64)
+    scores = np.empty(n_rows)
+    
+    for i in prange(n_rows):
+        code = _classify_texture_code(sand[i], silt[i], clay[i])
+        codes[i] = code
+        scores[i] = score_table[code]
+    
+    return codes, scores
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _soil_batch_core(sand, silt, clay, organic_matter, prop_table):
+    """
+    Clase textural y propiedades físicas de todas las muestras en un único bucle.
+    
+    prop_table tiene una fila por código de clase con field_capacity,
+    wilting_point, bulk_density, porosity y hydraulic_conductivity.
+    """
+    n_rows = sand.shape[0]
+    codes = np.empty(n_rows, dtype=np.int64)
+    field_capacity = np.empty(n_rows)
+    wilting_point = np.empty(n_rows)
+    available_water = np.empty(n_rows)
+    bulk_density = np.empty(n_rows)
+    porosity = np.empty(n_rows)
+    hydraulic_conductivity = np.empty(n_rows)
+    
+    for i in prange(n_rows):
+        code = _classify_texture_code(sand[i], silt[i], clay[i])
+        codes[i] = code
+        
+        om_factor = 1.0 + organic_matter[i] * 0.05
+        field_capacity[i] = prop_table[code, 0] * om_factor
+        wilting_point[i] = prop_table[code, 1] * om_factor
+        available_water[i] = field_capacity[i] - wilting_point[i]
+        bulk_density[i] = prop_table[code, 2] / om_factor
+        porosity[i] = min(0.65, prop_table[code, 3] * om_factor)
+        hydraulic_conductivity[i] = prop_table[code, 4] * om_factor
+    
+    return (
+        codes, field_capacity, wilting_point, available_water,
+        bulk_density, porosity, hydraulic_conductivity
+    )
+
 @dataclass
 class SoilTexture:
     """Estructura para propiedades de textura del suelo."""
@@ -136,46 +239,63 @@ class SoilTextureAnalyzer:
         """
         self.crop_type = crop_type
         self.optimal_params = self.OPTIMAL_TEXTURE.get(crop_type, self.OPTIMAL_TEXTURE['PALMA_ACEITERA'])
+        
+        # Adecuación por código de clase textural (posiciones de _CLASS_NAMES)
+        suitability = [self.evaluate_texture_suitability(name) for name in _CLASS_NAMES]
+        self._suit_categories = np.array([category for category, _ in suitability])
+        self._suit_scores = np.array([score for _, score in suitability], dtype=np.float64)
     
-    def classify_texture(self, sand: float, silt: float, clay: float) -> str:
+    def classify_texture(self, sand, silt, clay):
         """
         Clasificar textura del suelo usando triángulo textural.
         
         Args:
-            sand: Porcentaje de arena
-            silt: Porcentaje de limo
-            clay: Porcentaje de arcilla
+            sand: Porcentaje de arena (escalar o arreglo)
+            silt: Porcentaje de limo (escalar o arreglo)
+            clay: Porcentaje de arcilla (escalar o arreglo)
             
         Returns:
-            Clase textural
+            Clase textural (str, o np.ndarray de clases si se pasan arreglos)
         """
-        try:
-            # Normalizar a 100%
-            total = sand + silt + clay
-            if total == 0:
-                return "NO_DETERMINADA"
-            
-            sand_norm = (sand / total) * 100
-            silt_norm = (silt / total) * 100
-            clay_norm = (clay / total) * 100
+        # Clasificación basada en USDA (normalizada a 100%)
+        if np.ndim(sand) == 0 and np.ndim(silt) == 0 and np.ndim(clay) == 0:
+            return _CLASS_NAMES[_classify_texture_code(float(sand), float(silt), float(clay))]
+        
+        codes = _classify_texture_codes(
+            np.asarray(sand, dtype=np.float64),
+            np.asarray(silt, dtype=np.float64),
+            np.asarray(clay, dtype=np.float64)
+        )
+        return _CLASS_ARRAY[codes]
+    
+    def classify_texture_batch(
+        self,
+        sand: np.ndarray,
+        silt: np.ndarray,
+        clay: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Clasificar textura y evaluar adecuación de muchas muestras en una sola pasada.
+        
+        Args:
+            sand: Porcentajes de arena
+            silt: Porcentajes de limo
+            clay: Porcentajes de arcilla
             
-            # Clasificación basada en USDA
-            if clay_norm >= 40:
-                return "Arcilloso"
-            elif clay_norm >= 27 and silt_norm >= 15 and silt_norm <= 53 and sand_norm >= 20 and sand_norm <= 45:
-                return "Franco Arcilloso"
-            elif clay_norm >= 7 and clay_norm <= 27 and silt_norm >= 28 and silt_norm <= 50 and sand_norm >= 43 and sand_norm <= 52:
-                return "Franco"
-            elif sand_norm >= 70 and sand_norm <= 85 and clay_norm <= 20:
-                return "Franco Arcilloso-Arenoso"
-            elif sand_norm >= 85:
-                return "Arenoso"
-            else:
-                return "Franco"
-                
-        except Exception as e:
-            logger.error(f"Error clasificando textura: {e}")
-            return "NO_DETERMINADA"
+        Returns:
+            (texturas, categorías_adecuación, puntajes_adecuación) como arreglos
+        """
+        sand = np.ascontiguousarray(sand, dtype=np.float64)
+        silt = np.ascontiguousarray(silt, dtype=np.float64)
+        clay = np.ascontiguousarray(clay, dtype=np.float64)
+        
+        if NUMBA_AVAILABLE:
+            codes, scores = _texture_batch_core(sand, silt, clay, self._suit_scores)
+        else:
+            codes = _classify_texture_codes(sand, silt, clay)
+            scores = self._suit_scores[codes]
+        
+        return _CLASS_ARRAY[codes], self._suit_categories[codes], scores
     
     def calculate_physical_properties(
         self,
@@ -192,43 +312,41 @@ class SoilTextureAnalyzer:
         Returns:
             Propiedades físicas calculadas
         """
-        if texture_class not in self.TEXTURE_PROPERTIES:
-            texture_class = "Franco"
-        
-        base_props = self.TEXTURE_PROPERTIES[texture_class]
-        
-        # Ajustar con materia orgánica
+        # Fila base de la textura (clases desconocidas usan "Franco") ajustada con
+        # materia orgánica: la densidad aparente se divide por el factor
+        row = _PROP_TABLE[_CLASS_CODES.get(texture_class, 0)]
         om_factor = 1.0 + (organic_matter * 0.05)
-        
-        field_capacity = base_props['field_capacity'] * om_factor
-        wilting_point = base_props['wilting_point'] * om_factor
-        available_water = field_capacity - wilting_point
-        bulk_density = base_props['bulk_density'] / om_factor
-        porosity = min(0.65, base_props['porosity'] * om_factor)
-        hydraulic_conductivity = base_props['hydraulic_conductivity'] * om_factor
+        field_capacity, wilting_point, bulk_density, porosity, hydraulic_conductivity = (
+            row * om_factor ** _OM_EXPONENT
+        ).tolist()
         
         return {
-            'field_capacity': float(field_capacity),
-            'wilting_point': float(wilting_point),
-            'available_water': float(available_water),
-            'bulk_density': float(bulk_density),
-            'porosity': float(porosity),
-            'hydraulic_conductivity': float(hydraulic_conductivity)
+            'field_capacity': field_capacity,
+            'wilting_point': wilting_point,
+            'available_water': field_capacity - wilting_point,
+            'bulk_density': bulk_density,
+            'porosity': min(0.65, porosity),
+            'hydraulic_conductivity': hydraulic_conductivity
         }
     
-    def evaluate_texture_suitability(
-        self,
-        current_texture: str
-    ) -> Tuple[str, float]:
+    def evaluate_texture_suitability(self, current_texture):
         """
         Evaluar adecuación de textura para el cultivo.
         
         Args:
-            current_texture: Textura actual del suelo
+            current_texture: Textura actual del suelo (str o arreglo de texturas)
             
         Returns:
-            (categoría_adecuación, puntaje_adecuación)
+            (categoría_adecuación, puntaje_adecuación); arreglos si se pasa un arreglo
         """
+        if np.ndim(current_texture) > 0:
+            # Evaluar cada textura distinta una sola vez y expandir por índice
+            textures, inverse = np.unique(np.asarray(current_texture), return_inverse=True)
+            evaluated = [self.evaluate_texture_suitability(texture) for texture in textures]
+            categories = np.array([category for category, _ in evaluated])
+            scores = np.array([score for _, score in evaluated], dtype=np.float64)
+            return categories[inverse], scores[inverse]
+        
         optimal_texture = self.optimal_params['texture_class']
         
         # Jerarquía de texturas (de más arenoso a más arcilloso)
@@ -263,7 +381,7 @@ class SoilTextureAnalyzer:
         self,
         current_texture: str,
         suitability_score: float
-    ) -> List[str]:
+    ) -> Tuple[str, ...]:
         """
         Generar recomendaciones basadas en textura y adecuación.
         
@@ -272,25 +390,81 @@ class SoilTextureAnalyzer:
             suitability_score: Puntaje de adecuación
             
         Returns:
-            Lista de recomendaciones
+            Tupla de recomendaciones (precalculada, compartida entre llamadas)
         """
-        recommendations = []
+        score_bin = bisect.bisect_right(_SUITABILITY_BINS, suitability_score)
+        recommendations = _REC_CACHE.get((current_texture, score_bin))
+        if recommendations is None:
+            # Textura sin recomendaciones específicas
+            return (_SUITABILITY_NOTES[score_bin],)
+        return recommendations
+    
+    def analyze_soil_batch(
+        self,
+        sand: np.ndarray,
+        silt: np.ndarray,
+        clay: np.ndarray,
+        organic_matter: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Clasificación textural y propiedades físicas para muchas muestras a la vez.
         
-        # Recomendaciones específicas por textura
-        if current_texture in self.TEXTURE_RECOMMENDATIONS:
-            recommendations.extend(self.TEXTURE_RECOMMENDATIONS[current_texture])
+        Args:
+            sand: Porcentajes de arena
+            silt: Porcentajes de limo
+            clay: Porcentajes de arcilla
+            organic_matter: Contenidos de materia orgánica (%)
+            
+        Returns:
+            Diccionario de arreglos (una posición por muestra)
+        """
+        sand = np.ascontiguousarray(sand, dtype=np.float64)
+        silt = np.ascontiguousarray(silt, dtype=np.float64)
+        clay = np.ascontiguousarray(clay, dtype=np.float64)
+        organic_matter = np.ascontiguousarray(organic_matter, dtype=np.float64)
         
-        # Recomendaciones basadas en adecuación
-        if suitability_score < 0.4:
-            recommendations.append("⚠️ CONSIDERAR CAMBIO DE CULTIVO: La textura es muy limitante")
-        elif suitability_score < 0.6:
-            recommendations.append("📋 REALIZAR ENMIENDAS: Mejorar propiedades físicas del suelo")
-        elif suitability_score < 0.8:
-            recommendations.append("🔍 MONITOREAR: La textura es aceptable pero requiere atención")
+        if NUMBA_AVAILABLE:
+            (
+                codes, field_capacity, wilting_point, available_water,
+                bulk_density, porosity, hydraulic_conductivity
+            ) = _soil_batch_core(sand, silt, clay, organic_matter, _PROP_TABLE)
         else:
-            recommendations.append("✅ ÓPTIMO: Mantener prácticas actuales de manejo")
+            codes = _classify_texture_codes(sand, silt, clay)
+            (
+                field_capacity, wilting_point, available_water,
+                bulk_density, porosity, hydraulic_conductivity
+            ) = self._physical_properties_batch(codes, organic_matter)
         
-        return recommendations
+        return {
+            'texture_class': _CLASS_ARRAY[codes],
+            'field_capacity': field_capacity,
+            'wilting_point': wilting_point,
+            'available_water': available_water,
+            'bulk_density': bulk_density,
+            'porosity': porosity,
+            'hydraulic_conductivity': hydraulic_conductivity
+        }
+    
+    def _physical_properties_batch(
+        self,
+        codes: np.ndarray,
+        organic_matter: np.ndarray
+    ) -> Tuple[np.ndarray, ...]:
+        """Versión NumPy de las propiedades físicas de _soil_batch_core (sin Numba)."""
+        rows = _PROP_TABLE[codes]
+        om_factor = 1.0 + organic_matter * 0.05
+        
+        field_capacity = rows[:, 0] * om_factor
+        wilting_point = rows[:, 1] * om_factor
+        available_water = field_capacity - wilting_point
+        bulk_density = rows[:, 2] / om_factor
+        porosity = np.minimum(0.65, rows[:, 3] * om_factor)
+        hydraulic_conductivity = rows[:, 4] * om_factor
+        
+        return (
+            field_capacity, wilting_point, available_water,
+            bulk_density, porosity, hydraulic_conductivity
+        )
     
     def analyze_soil_sample(
         self,
@@ -333,3 +507,34 @@ class SoilTextureAnalyzer:
             suitability_score=float(suitability_score),
             recommendations=recommendations
         )
+
+# Propiedades base en tabla indexada por código de clase; el código 0
+# (NO_DETERMINADA) usa "Franco", igual que calculate_physical_properties
+_PROP_FIELDS = ('field_capacity', 'wilting_point', 'bulk_density', 'porosity', 'hydraulic_conductivity')
+_PROP_TABLE = np.array(
+    [
+        [SoilTextureAnalyzer.TEXTURE_PROPERTIES[name][field] for field in _PROP_FIELDS]
+        for name in ("Franco",) + _CLASS_NAMES[1:]
+    ],
+    dtype=np.float64
+)
+_CLASS_ARRAY = np.array(_CLASS_NAMES)
+
+# Exponente del factor de materia orgánica por columna de _PROP_TABLE
+_OM_EXPONENT = np.array([1.0, 1.0, -1.0, 1.0, 1.0])
+
+# Recomendación según adecuación; tramos separados por _SUITABILITY_BINS
+_SUITABILITY_BINS = (0.4, 0.6, 0.8)
+_SUITABILITY_NOTES = (
+    "⚠️ CONSIDERAR CAMBIO DE CULTIVO: La textura es muy limitante",
+    "📋 REALIZAR ENMIENDAS: Mejorar propiedades físicas del suelo",
+    "🔍 MONITOREAR: La textura es aceptable pero requiere atención",
+    "✅ ÓPTIMO: Mantener prácticas actuales de manejo"
+)
+
+# Recomendaciones finales por (textura, tramo de adecuación), armadas una sola vez
+_REC_CACHE = {
+    (texture, score_bin): tuple(base) + (note,)
+    for texture, base in SoilTextureAnalyzer.TEXTURE_RECOMMENDATIONS.items()
+    for score_bin, note in enumerate(_SUITABILITY_NOTES)
+}
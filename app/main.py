@@ -3,23 +3,30 @@
 Aplicación principal Streamlit - Analizador de Cultivos Digital Twin
 """
 import streamlit as st
-import geopandas as gpd
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import date
 import warnings
 import os
+import copy
+import hashlib
 import sys
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Añadir directorio actual al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importar módulos personalizados
-from ui.styles import inject_custom_css, create_color_palette, get_status_color
+from ui.styles import custom_css_markup, create_color_palette, get_status_color
 from ui.components import (
     create_metric_card,
+    create_metric_cards,
     create_info_card,
-    create_warning_card,
+    create_info_cards,
     create_error_card,
     create_success_card,
     create_analysis_tabs,
@@ -32,9 +39,11 @@ from ui.components import (
 from core.analysis import SoilAnalyzer
 from core.climate import ClimateAnalyzer
 from core.soil import SoilTextureAnalyzer
+from core._njit import NUMBA_AVAILABLE
 from utils.file_processing import FileProcessor
-from utils.visualization import MapVisualizer
-from streamlit_folium import st_folium
+
+# folium, plotly y matplotlib (utils.visualization) se importan dentro de las
+# pestañas que los usan, para no cargarlos en el arranque en frío
 
 # Configuración de la página
 st.set_page_config(
@@ -47,53 +56,241 @@ st.set_page_config(
 # Suprimir advertencias
 warnings.filterwarnings("ignore", message=".*initial implementation of Parquet.*")
 
-# Inyectar CSS personalizado
-inject_custom_css()
 colors = create_color_palette()
 
+# Etiquetas de cultivos e indicadores, calculadas una sola vez
+_CULTIVO_LABELS = {c: c.replace("_", " ").title() for c in ("PALMA_ACEITERA", "CACAO", "BANANO")}
+_INDICATOR_LABELS = {
+    name: name.replace("_", " ").title()
+    for name in ("solar_radiation", "precipitation", "temperature", "water_balance")
+}
+
+# Mes por defecto del selector, calculado al iniciar el proceso (el widget conserva
+# luego su valor por clave)
+_DEFAULT_MONTH_INDEX = date.today().month - 1
+
+# Bloques HTML estáticos (CSS, header y footer)
+@st.cache_resource
+def _static_html():
+    """Construir una sola vez el HTML estático compartido entre reruns."""
+    footer_style = f"style=\"text-align: center; color: {colors['text_light']};\""
+    link_style = f"style=\"color: {colors['primary']};\""
+    
+    return {
+        "css": custom_css_markup(),
+        "header": f"""
+    <div class="main-header">
+        <h1 style="color: {colors['primary']}; margin: 0;">🌱 ANALIZADOR CULTIVOS DIGITAL TWIN</h1>
+        <p style="color: {colors['text_light']}; margin-top: 0.5rem;">
+            Análisis avanzado con NASA POWER API + PlanetScope | v2.0
+        </p>
+    </div>
+    """,
+        # Pie de página: las tres columnas en una sola grilla CSS
+        "footer": f"""
+    <hr>
+    <div class="footer-grid">
+        <div {footer_style}>
+            <p>🌿 <b>Analizador de Cultivos Digital Twin v2.0</b></p>
+            <p>Powered by NASA POWER API</p>
+        </div>
+        <div {footer_style}>
+            <p>📧 <b>Soporte:</b> soporte@agtech.com</p>
+            <p>📞 <b>Teléfono:</b> +57 1 234 5678</p>
+        </div>
+        <div {footer_style}>
+            <p>🔗 <b>Enlaces:</b></p>
+            <p>
+                <a href="#" {link_style}>Documentación</a> | 
+                <a href="#" {link_style}>API</a> | 
+                <a href="#" {link_style}>GitHub</a>
+            </p>
+        </div>
+    </div>
+    """
+    }
+
+# Inyectar CSS personalizado
+st.markdown(_static_html()["css"], unsafe_allow_html=True)
+
+# Fragmentos: st.fragment (Streamlit >= 1.37) o experimental_fragment (>= 1.33);
+# en versiones anteriores las pestañas se renderizan como funciones normales
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", lambda func: func)
+
 # Configurar variables de entorno
 os.environ['SHAPE_RESTORE_SHX'] = 'YES'
 
+# Valores iniciales de session state
+_SESSION_DEFAULTS = {
+    'gdf_original': None,
+    'gdf_analisis': None,
+    'df_analisis': None,
+    'analisis_textura': None,
+    'area_total': 0.0,
+    'analisis_completado': False,
+    'datos_clima': {},
+    'datos_satelitales': {},
+    'datos_clima_historicos': {},
+    'cultivo_seleccionado': "PALMA_ACEITERA",
+    'mes_seleccionado': "ENERO",
+    'n_zonas_seleccionado': 16,
+    'last_params': None,
+    'analysis_id': None,
+    'excel_export': None,
+    'upload_key': None,
+    'parcel_digest': None,
+    'centroid': None,
+    'agregados': None,
+    'choropleth_bins': {}
+}
+
 # Inicializar session state
 def init_session_state():
     """Inicializar variables de session state."""
-    if 'gdf_original' not in st.session_state:
-        st.session_state.gdf_original = None
-    if 'gdf_analisis' not in st.session_state:
-        st.session_state.gdf_analisis = None
-    if 'analisis_textura' not in st.session_state:
-        st.session_state.analisis_textura = None
-    if 'area_total' not in st.session_state:
-        st.session_state.area_total = 0.0
-    if 'analisis_completado' not in st.session_state:
-        st.session_state.analisis_completado = False
-    if 'datos_clima' not in st.session_state:
-        st.session_state.datos_clima = {}
-    if 'datos_satelitales' not in st.session_state:
-        st.session_state.datos_satelitales = {}
-    if 'datos_clima_historicos' not in st.session_state:
-        st.session_state.datos_clima_historicos = {}
-    if 'cultivo_seleccionado' not in st.session_state:
-        st.session_state.cultivo_seleccionado = "PALMA_ACEITERA"
-    if 'mes_seleccionado' not in st.session_state:
-        st.session_state.mes_seleccionado = "ENERO"
-    if 'n_zonas_seleccionado' not in st.session_state:
-        st.session_state.n_zonas_seleccionado = 16
+    for key, default in _SESSION_DEFAULTS.items():
+        if key not in st.session_state:
+            # Copia de los contenedores para no compartirlos entre sesiones
+            st.session_state[key] = copy.copy(default)
 
 # Header principal
 def render_header():
     """Renderizar header de la aplicación."""
-    st.markdown(f"""
-    <div class="main-header">
-        <h1 style="color: {colors['primary']}; margin: 0;">🌱 ANALIZADOR CULTIVOS DIGITAL TWIN</h1>
-        <p style="color: {colors['text_light']}; margin-top: 0.5rem;">
-            Análisis avanzado con NASA POWER API + PlanetScope | v2.0
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_static_html()["header"], unsafe_allow_html=True)
     
     st.markdown("---")
 
+# Analizadores compartidos (sin estado por usuario), uno por parámetros
+@st.cache_resource(show_spinner=False)
+def get_soil_analyzer(cultivo: str, mes: str) -> SoilAnalyzer:
+    """Analizador de fertilidad para un cultivo y mes."""
+    return SoilAnalyzer(cultivo, mes)
+
+@st.cache_resource(show_spinner=False)
+def get_climate_analyzer() -> ClimateAnalyzer:
+    """Analizador climático (sesión HTTP reutilizada entre análisis)."""
+    return ClimateAnalyzer()
+
+@st.cache_resource(show_spinner=False)
+def get_texture_analyzer(cultivo: str) -> SoilTextureAnalyzer:
+    """Analizador de textura para un cultivo."""
+    return SoilTextureAnalyzer(cultivo)
+
+# Compilación de los núcleos Numba, una vez por proceso
+@st.cache_resource(show_spinner=False)
+def _warm_up_kernels():
+    """Ejecutar los núcleos numéricos con datos mínimos para compilarlos antes del primer análisis."""
+    if not NUMBA_AVAILABLE:
+        return
+    
+    get_soil_analyzer("PALMA_ACEITERA", "ENERO").analyze_zones_df(pd.DataFrame({'x': [0.0], 'y': [0.0]}))
+    sample = np.full(1, 40.0)
+    texture_analyzer = get_texture_analyzer("PALMA_ACEITERA")
+    texture_analyzer.analyze_soil_batch(sample, sample, sample, sample)
+    texture_analyzer.classify_texture_batch(sample, sample, sample)
+
+# Decimales de latitud/longitud con que se consulta NASA POWER
+CLIMATE_COORD_DECIMALS = 3
+
+# Datos NASA POWER memorizados en el proceso (ClimateAnalyzer mantiene además
+# su caché en disco, compartida entre procesos)
+@st.cache_data(ttl=ClimateAnalyzer.CURRENT_CACHE_TTL, max_entries=256, show_spinner=False)
+def _fetch_current_climate(lat: float, lon: float, month: str):
+    """Condiciones climáticas actuales para una ubicación y mes."""
+    return get_climate_analyzer().get_current_climate(lat, lon, month)
+
+@st.cache_data(ttl=7 * 24 * 3600, max_entries=256, show_spinner=False)
+def _fetch_historical_climate(lat: float, lon: float, years: int = 10):
+    """Promedios mensuales históricos para una ubicación."""
+    return get_climate_analyzer().get_historical_climate(lat, lon, years=years)
+
+# Lectura de parcela, una vez por contenido de archivo
+@st.cache_data(max_entries=8, show_spinner=False)
+def _parse_parcela(file_bytes: bytes, file_name: str, digest: str):
+    """
+    Procesar el archivo subido (cacheado por contenido).
+    
+    Devuelve el GeoDataFrame, su área en hectáreas y el centro ``(lat, lon)``
+    de su bounding box: basta para centrar mapas y consultar NASA POWER
+    (celdas de 0.5°) y no requiere unir las geometrías.
+    """
+    gdf = FileProcessor.process_file_bytes(file_bytes, file_name, digest=digest)
+    if gdf is None:
+        return None, 0.0, None
+    minx, miny, maxx, maxy = gdf.total_bounds
+    return gdf, FileProcessor.calculate_area(gdf), ((miny + maxy) / 2, (minx + maxx) / 2)
+
+# Zonificación y textura, memorizadas por contenido de parcela y parámetros
+@st.cache_data(max_entries=16, show_spinner=False)
+def _divide_zones(parcel_digest: str, n_zonas: int, _gdf_original):
+    """
+    Dividir la parcela en zonas (cacheado).
+    
+    ``parcel_digest`` (hash del archivo subido) identifica la parcela; el
+    GeoDataFrame no se hashea.
+    """
+    return FileProcessor.divide_into_zones(_gdf_original, n_zones=n_zonas)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _texture_analysis(parcel_digest: str, cultivo: str, mes: str, n_zonas: int, _gdf_zonas):
+    """
+    Simular y clasificar la textura de cada zona (cacheado).
+    
+    La semilla depende de los parámetros, por lo que el resultado es
+    determinista para una misma parcela, cultivo, mes y número de zonas.
+    """
+    # Generador con semilla estable por parámetros: una sola extracción
+    # para las tres fracciones
+    seed = zlib.crc32(f"{cultivo}|{mes}|{n_zonas}".encode())
+    rng = np.random.default_rng(seed)
+    arena, limo, arcilla = rng.uniform(
+        [[30], [20], [10]], [[60], [40], [40]], size=(3, len(_gdf_zonas))
+    )
+    
+    # Clasificar textura y evaluar adecuación en lote
+    textures, categorias, puntajes = get_texture_analyzer(cultivo).classify_texture_batch(
+        arena, limo, arcilla
+    )
+    
+    # Asignar todas las columnas de una vez
+    return _gdf_zonas.assign(
+        arena=arena,
+        limo=limo,
+        arcilla=arcilla,
+        textura_suelo=pd.Categorical(textures),
+        categoria_adecuacion=pd.Categorical(categorias),
+        adecuacion_textura=puntajes
+    )
+
+# Agregados del análisis, calculados una vez por análisis
+def _fertility_aggregates(df_analisis: pd.DataFrame) -> dict:
+    """
+    Resumir el análisis de fertilidad para los tabs.
+    
+    Las medias, totales, conteos y el top 10 se calculan al terminar el análisis
+    y se guardan en session_state, de modo que los reruns solo los leen.
+    """
+    columns = set(df_analisis.columns)
+    agregados = {
+        'avg_fertility': float(df_analisis['indice_fertilidad'].mean()),
+        # Solo prioridades presentes (value_counts de un Categorical incluye ceros)
+        'priority_counts': df_analisis['prioridad'].value_counts().loc[lambda c: c > 0],
+        'top10_fertility': df_analisis.nlargest(10, 'indice_fertilidad'),
+        'avg_npk': None,
+        'totals_npk': None
+    }
+    
+    if {'nitrogeno', 'fosforo', 'potasio'} <= columns:
+        agregados['avg_npk'] = tuple(
+            df_analisis[['nitrogeno', 'fosforo', 'potasio']].mean().tolist()
+        )
+    
+    if {'recomendacion_n', 'recomendacion_p', 'recomendacion_k'} <= columns:
+        agregados['totals_npk'] = tuple(
+            df_analisis[['recomendacion_n', 'recomendacion_p', 'recomendacion_k']].sum().tolist()
+        )
+    
+    return agregados
+
 # Sidebar de configuración
 def render_sidebar():
     """Renderizar sidebar de configuración."""
@@ -104,119 +301,155 @@ def render_sidebar():
         uploaded_file = st.file_uploader(
             "📤 **Subir parcela**",
             type=["zip", "kml", "geojson", "shp"],
+            key="parcela_uploader",
             help="Formato: Shapefile ZIP, KML o GeoJSON"
         )
         
         if uploaded_file is not None:
-            with st.spinner("🔄 Procesando archivo..."):
-                gdf = FileProcessor.process_uploaded_file(uploaded_file)
+            # file_id cambia con cada subida, aunque se repitan nombre y tamaño
+            upload_key = uploaded_file.file_id
+            
+            # Solo se procesa cuando cambia el archivo; los reruns reutilizan la parcela
+            if st.session_state.upload_key != upload_key:
+                with st.spinner("🔄 Procesando archivo..."):
+                    file_bytes = uploaded_file.getvalue()
+                    digest = hashlib.sha1(file_bytes).hexdigest()
+                    gdf, area, centroid = _parse_parcela(file_bytes, uploaded_file.name, digest)
                 
                 if gdf is not None:
+                    # Parcela nueva: los resultados anteriores ya no aplican
+                    st.session_state.upload_key = upload_key
+                    st.session_state.parcel_digest = digest
+                    st.session_state.analisis_completado = False
                     st.session_state.gdf_original = gdf
-                    st.session_state.area_total = FileProcessor.calculate_area(gdf)
-                    st.success(f"✅ Parcela procesada ({st.session_state.area_total:.2f} ha)")
-                else:
-                    st.error("❌ Error procesando archivo")
+                    st.session_state.area_total = area
+                    st.session_state.centroid = centroid
+            
+            if st.session_state.upload_key == upload_key:
+                st.success(f"✅ Parcela procesada ({st.session_state.area_total:.2f} ha)")
+            else:
+                st.error("❌ Error procesando archivo")
         
         st.markdown("---")
         
-        # Selección de parámetros
-        st.markdown("### 🌱 **Parámetros del Cultivo**")
-        
-        cultivo = st.selectbox(
-            "**Cultivo**",
-            ["PALMA_ACEITERA", "CACAO", "BANANO"],
-            index=0,
-            key="cultivo_select",
-            help="Seleccione el cultivo a analizar"
-        )
-        
-        mes = st.selectbox(
-            "**Mes de Análisis**",
-            ["ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
-             "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"],
-            index=datetime.now().month - 1,
-            key="mes_select",
-            help="Seleccione el mes para el análisis climático"
-        )
-        
-        n_zonas = st.slider(
-            "**Número de Zonas**",
-            min_value=4,
-            max_value=50,
-            value=16,
-            step=1,
-            key="zonas_slider",
-            help="Divide la parcela en zonas homogéneas para análisis detallado"
-        )
+        # Parámetros agrupados en un formulario: un único rerun al enviar
+        with st.form("cfg"):
+            # Selección de parámetros
+            st.markdown("### 🌱 **Parámetros del Cultivo**")
+            
+            cultivo = st.selectbox(
+                "**Cultivo**",
+                list(_CULTIVO_LABELS),
+                index=0,
+                format_func=_CULTIVO_LABELS.__getitem__,
+                key="cultivo_select",
+                help="Seleccione el cultivo a analizar"
+            )
+            
+            mes = st.selectbox(
+                "**Mes de Análisis**",
+                ["ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
+                 "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"],
+                index=_DEFAULT_MONTH_INDEX,
+                key="mes_select",
+                help="Seleccione el mes para el análisis climático"
+            )
+            
+            n_zonas = st.slider(
+                "**Número de Zonas**",
+                min_value=4,
+                max_value=50,
+                value=16,
+                step=1,
+                key="zonas_slider",
+                help="Divide la parcela en zonas homogéneas para análisis detallado"
+            )
+            
+            # Botón de análisis
+            st.markdown("---")
+            submitted = st.form_submit_button(
+                "🚀 **Iniciar Análisis Completo**",
+                type="primary",
+                use_container_width=True,
+                disabled=st.session_state.gdf_original is None
+            )
         
-        # Botón de análisis
-        st.markdown("---")
-        if st.button(
-            "🚀 **Iniciar Análisis Completo**",
-            type="primary",
-            use_container_width=True,
-            disabled=st.session_state.gdf_original is None
-        ):
+        if submitted:
+            st.session_state.last_params = (cultivo, mes, n_zonas)
             st.session_state.cultivo_seleccionado = cultivo
             st.session_state.mes_seleccionado = mes
             st.session_state.n_zonas_seleccionado = n_zonas
             
             with st.spinner("🔬 **Ejecutando análisis completo...**"):
                 try:
-                    # Dividir en zonas
-                    gdf_zonas = FileProcessor.divide_into_zones(
-                        st.session_state.gdf_original,
-                        n_zones=n_zonas
-                    )
-                    
-                    # Inicializar analizadores
-                    soil_analyzer = SoilAnalyzer(cultivo, mes)
-                    climate_analyzer = ClimateAnalyzer()
-                    texture_analyzer = SoilTextureAnalyzer(cultivo)
+                    # Centroide de la parcela (calculado al subir el archivo)
+                    lat, lon = st.session_state.centroid
                     
-                    # Obtener centroide para datos climáticos
-                    centroid = gdf_zonas.unary_union.centroid
-                    
-                    # Obtener datos climáticos
-                    st.session_state.datos_clima = climate_analyzer.get_current_climate(
-                        centroid.y, centroid.x, mes
-                    )
+                    # Coordenadas redondeadas (~100 m) como clave de caché estable
+                    lat = round(lat, CLIMATE_COORD_DECIMALS)
+                    lon = round(lon, CLIMATE_COORD_DECIMALS)
                     
-                    # Obtener datos históricos
-                    st.session_state.datos_clima_historicos = climate_analyzer.get_historical_climate(
-                        centroid.y, centroid.x, years=10
-                    )
-                    
-                    # Analizar fertilidad
-                    st.session_state.gdf_analisis = soil_analyzer.analyze_zones(
-                        gdf_zonas,
-                        n_zones=n_zonas
-                    )
-                    
-                    # Analizar textura (datos simulados)
-                    texture_gdf = gdf_zonas.copy()
-                    for idx in range(len(texture_gdf)):
-                        # Generar datos de textura simulados
-                        texture_gdf.loc[idx, 'arena'] = np.random.uniform(30, 60)
-                        texture_gdf.loc[idx, 'limo'] = np.random.uniform(20, 40)
-                        texture_gdf.loc[idx, 'arcilla'] = np.random.uniform(10, 40)
+                    # Descargas climáticas en segundo plano mientras se calculan
+                    # zonas y textura; los hilos heredan el contexto del script
+                    # para que st.cache_data funcione en ellos
+                    with ThreadPoolExecutor(
+                        max_workers=2,
+                        initializer=add_script_run_ctx,
+                        initargs=(None, get_script_run_ctx())
+                    ) as pool:
+                        clima_future = pool.submit(_fetch_current_climate, lat, lon, mes)
+                        historicos_future = pool.submit(_fetch_historical_climate, lat, lon, years=10)
+                        
+                        # Dividir en zonas (reutilizadas si la parcela y n_zonas no cambian)
+                        gdf_zonas = _divide_zones(
+                            st.session_state.parcel_digest,
+                            n_zonas,
+                            st.session_state.gdf_original
+                        )
                         
-                        # Clasificar textura
-                        texture = texture_analyzer.classify_texture(
-                            texture_gdf.loc[idx, 'arena'],
-                            texture_gdf.loc[idx, 'limo'],
-                            texture_gdf.loc[idx, 'arcilla']
+                        # Analizar textura (datos simulados, cacheados por parámetros)
+                        texture_gdf = _texture_analysis(
+                            st.session_state.parcel_digest,
+                            cultivo,
+                            mes,
+                            n_zonas,
+                            gdf_zonas
                         )
-                        texture_gdf.loc[idx, 'textura_suelo'] = texture
                         
-                        # Evaluar adecuación
-                        categoria, puntaje = texture_analyzer.evaluate_texture_suitability(texture)
-                        texture_gdf.loc[idx, 'categoria_adecuacion'] = categoria
-                        texture_gdf.loc[idx, 'adecuacion_textura'] = puntaje
+                        # Inicializar analizador de fertilidad
+                        soil_analyzer = get_soil_analyzer(cultivo, mes)
+                        
+                        # La fertilidad necesita el clima actual (rendimiento potencial)
+                        datos_clima = clima_future.result()
+                        gdf_analisis = soil_analyzer.analyze_zones(
+                            gdf_zonas,
+                            n_zones=n_zonas,
+                            climate_data=datos_clima
+                        )
+                        
+                        datos_clima_historicos = historicos_future.result()
                     
+                    # Publicar resultados solo cuando todo el análisis terminó
+                    st.session_state.datos_clima = datos_clima
+                    st.session_state.datos_clima_historicos = datos_clima_historicos
+                    st.session_state.gdf_analisis = gdf_analisis
+                    # Copia tabular sin geometría para tablas, métricas y exportaciones
+                    df_analisis = pd.DataFrame(gdf_analisis.drop(columns='geometry'))
+                    st.session_state.df_analisis = df_analisis
                     st.session_state.analisis_textura = texture_gdf
+                    st.session_state.agregados = _fertility_aggregates(df_analisis)
+                    # Intervalos de las coropletas, fijos para este análisis
+                    st.session_state.choropleth_bins = {
+                        column: np.histogram_bin_edges(frame[column].dropna(), bins=7).tolist()
+                        for frame, column in (
+                            (df_analisis, 'indice_fertilidad'),
+                            (df_analisis, 'rendimiento_potencial'),
+                            (texture_gdf, 'adecuacion_textura')
+                        )
+                        if column in frame.columns
+                    }
                     st.session_state.analisis_completado = True
+                    st.session_state.analysis_id = uuid.uuid4().hex
                     
                     st.success("✅ **Análisis completado exitosamente!**")
                     
@@ -266,103 +499,139 @@ def render_main_content():
         else:
             render_welcome_screen()
 
+# Tablas Arrow para st.dataframe, convertidas una vez por análisis y vista
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _arrow_table(analysis_id, columns, decimals, _df):
+    """
+    Seleccionar, redondear y convertir columnas del análisis a ``pyarrow.Table``.
+    
+    ``st.dataframe`` serializa con Arrow en cada rerun; la tabla ya convertida
+    (inmutable, por eso ``cache_resource``) evita repetir la conversión.
+    """
+    import pyarrow as pa
+    
+    return pa.Table.from_pandas(
+        _df[list(columns)].round(decimals),
+        preserve_index=False
+    )
+
+# Figuras del tablero, construidas una vez por análisis
+@st.cache_data(max_entries=8, show_spinner=False)
+def _dashboard_figures(analysis_id, _df_analisis, _priority_counts):
+    """
+    Construir el histograma de fertilidad y el gráfico de prioridades.
+    
+    ``analysis_id`` es la clave de caché; los datos no se hashean (prefijo ``_``).
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
+    # Histograma de fertilidad, binado en el servidor (solo viajan 20 barras)
+    counts, edges = np.histogram(
+        _df_analisis['indice_fertilidad'].to_numpy(),
+        bins=20,
+        range=(0, 1)
+    )
+    fertility_fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=colors['primary']
+    ))
+    fertility_fig.update_layout(
+        title="Distribución del Índice de Fertilidad",
+        xaxis_title="Índice de Fertilidad",
+        yaxis_title="count",
+        xaxis_range=[0, 1],
+        bargap=0.1
+    )
+    
+    # Gráfico de pastel de prioridades
+    priority_fig = px.pie(
+        values=_priority_counts.values,
+        names=_priority_counts.index,
+        title="Distribución de Prioridades",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    priority_fig.update_traces(textposition='inside', textinfo='percent+label')
+    
+    return fertility_fig, priority_fig
+
 # Tablero de control
+@fragment
 def render_dashboard_tab():
     """Renderizar pestaña de dashboard."""
     st.markdown("## 📊 **Dashboard de Análisis**")
     
-    # Métricas principales
-    col1, col2, col3, col4 = st.columns(4)
+    # Métricas principales (un único bloque HTML)
+    cards = [{
+        'title': "Área Total",
+        'value': f"{st.session_state.area_total:.2f} ha",
+        'help_text': "Área total de la parcela"
+    }]
     
-    with col1:
-        create_metric_card(
-            "Área Total",
-            f"{st.session_state.area_total:.2f} ha",
-            help_text="Área total de la parcela"
-        )
+    if st.session_state.gdf_analisis is not None:
+        avg_fertility = st.session_state.agregados['avg_fertility']
+        cards.append({
+            'title': "Fertilidad Promedio",
+            'value': f"{avg_fertility:.3f}",
+            'delta': "Óptimo" if avg_fertility > 0.7 else "Mejorable",
+            'delta_color': "normal" if avg_fertility > 0.7 else "inverse",
+            'help_text': "Índice de fertilidad promedio (0-1)"
+        })
     
-    with col2:
-        if st.session_state.gdf_analisis is not None:
-            avg_fertility = st.session_state.gdf_analisis['indice_fertilidad'].mean()
-            create_metric_card(
-                "Fertilidad Promedio",
-                f"{avg_fertility:.3f}",
-                delta="Óptimo" if avg_fertility > 0.7 else "Mejorable",
-                delta_color="normal" if avg_fertility > 0.7 else "inverse",
-                help_text="Índice de fertilidad promedio (0-1)"
-            )
+    if st.session_state.datos_clima:
+        cards.append({
+            'title': "Precipitación",
+            'value': f"{st.session_state.datos_clima.precipitation:.1f} mm/día",
+            'help_text': "Precipitación diaria promedio"
+        })
     
-    with col3:
-        if st.session_state.datos_clima:
-            create_metric_card(
-                "Precipitación",
-                f"{st.session_state.datos_clima['precipitation']:.1f} mm/día",
-                help_text="Precipitación diaria promedio"
-            )
+    cards.append({
+        'title': "Zonas Analizadas",
+        'value': f"{len(st.session_state.gdf_analisis) if st.session_state.gdf_analisis is not None else 0}",
+        'help_text': "Número de zonas homogéneas"
+    })
     
-    with col4:
-        create_metric_card(
-            "Zonas Analizadas",
-            f"{len(st.session_state.gdf_analisis) if st.session_state.gdf_analisis is not None else 0}",
-            help_text="Número de zonas homogéneas"
-        )
+    create_metric_cards(cards)
     
     st.markdown("---")
     
     # Gráficos principales
     col1, col2 = st.columns(2)
     
-    with col1:
-        if st.session_state.gdf_analisis is not None:
+    if st.session_state.gdf_analisis is not None:
+        fertility_fig, priority_fig = _dashboard_figures(
+            st.session_state.analysis_id,
+            st.session_state.df_analisis,
+            st.session_state.agregados['priority_counts']
+        )
+        
+        with col1:
             st.markdown("### 📈 **Distribución de Fertilidad**")
-            
-            # Histograma de fertilidad
-            fig = px.histogram(
-                st.session_state.gdf_analisis,
-                x='indice_fertilidad',
-                nbins=20,
-                title="Distribución del Índice de Fertilidad",
-                labels={'indice_fertilidad': 'Índice de Fertilidad'},
-                color_discrete_sequence=[colors['primary']]
-            )
-            
-            fig.update_layout(
-                xaxis_range=[0, 1],
-                bargap=0.1
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        if st.session_state.gdf_analisis is not None:
+            st.plotly_chart(fertility_fig, use_container_width=True)
+        
+        with col2:
             st.markdown("### 🎯 **Prioridad de Intervención**")
-            
-            # Gráfico de pastel de prioridades
-            priority_counts = st.session_state.gdf_analisis['prioridad'].value_counts()
-            fig = px.pie(
-                values=priority_counts.values,
-                names=priority_counts.index,
-                title="Distribución de Prioridades",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(priority_fig, use_container_width=True)
     
     # Tabla resumen
     st.markdown("### 📋 **Resumen por Zona**")
     
     if st.session_state.gdf_analisis is not None:
         summary_cols = ['id_zona', 'area_ha', 'indice_fertilidad', 'categoria', 'prioridad']
-        if 'textura_suelo' in st.session_state.gdf_analisis.columns:
+        if 'textura_suelo' in st.session_state.df_analisis.columns:
             summary_cols.append('textura_suelo')
         
-        summary_df = st.session_state.gdf_analisis[summary_cols].copy()
-        summary_df['area_ha'] = summary_df['area_ha'].round(2)
-        summary_df['indice_fertilidad'] = summary_df['indice_fertilidad'].round(3)
+        summary_table = _arrow_table(
+            st.session_state.analysis_id,
+            tuple(summary_cols),
+            {'area_ha': 2, 'indice_fertilidad': 3},
+            st.session_state.df_analisis
+        )
         
         st.dataframe(
-            summary_df,
+            summary_table,
             use_container_width=True,
             hide_index=True,
             column_config={
@@ -372,9 +641,88 @@ def render_dashboard_tab():
             }
         )
 
+# Mapa interactivo pre-renderizado
+@st.cache_data(max_entries=32, show_spinner=False)
+def _render_map_html(
+    analysis_id,
+    map_type,
+    layer_style,
+    center,
+    _gdf_analisis,
+    _analisis_textura,
+    _gdf_original,
+    _bins
+):
+    """
+    Construir el mapa Folium y devolver su HTML.
+    
+    Los GeoDataFrames y los intervalos precalculados no se hashean (prefijo
+    ``_``); ``analysis_id`` identifica el análisis del que provienen, de modo
+    que cada combinación de análisis, tipo de mapa y capa base se renderiza
+    una sola vez.
+    """
+    from utils.visualization import MapVisualizer
+    
+    visualizer = MapVisualizer(
+        center_lat=center[0],
+        center_lon=center[1],
+        zoom=14
+    )
+    
+    # Crear mapa base
+    m = visualizer.create_base_map(layer=layer_style)
+    
+    # Añadir capa según tipo
+    if map_type == "Fertilidad":
+        m = visualizer.add_choropleth_layer(
+            m,
+            MapVisualizer.simplify_for_display(_gdf_analisis),
+            column='indice_fertilidad',
+            bins=_bins.get('indice_fertilidad', 7),
+            layer_name="Fertilidad",
+            palette='fertility',
+            legend_name="Índice de Fertilidad"
+        )
+    elif map_type == "Textura" and _analisis_textura is not None:
+        m = visualizer.add_choropleth_layer(
+            m,
+            MapVisualizer.simplify_for_display(_analisis_textura),
+            column='adecuacion_textura',
+            bins=_bins.get('adecuacion_textura', 7),
+            layer_name="Adecuación de Textura",
+            palette='texture',
+            legend_name="Puntaje de Adecuación"
+        )
+    elif map_type == "Potencial":
+        # Capa de potencial calculada en el análisis de zonas
+        m = visualizer.add_choropleth_layer(
+            m,
+            MapVisualizer.simplify_for_display(_gdf_analisis),
+            column='rendimiento_potencial',
+            bins=_bins.get('rendimiento_potencial', 7),
+            layer_name="Potencial de Cosecha",
+            palette='yield_potential',
+            legend_name="Ton/Ha"
+        )
+    
+    # Añadir capa de parcela original
+    if _gdf_original is not None:
+        m = visualizer.add_parcel_layer(
+            m,
+            MapVisualizer.simplify_for_display(_gdf_original),
+            layer_name="Parcela Original",
+            color='gray',
+            fill_opacity=0.1
+        )
+    
+    return m.get_root().render()
+
 # Pestaña de mapas
+@fragment
 def render_map_tab():
     """Renderizar pestaña de mapas."""
+    from utils.visualization import MapVisualizer
+    
     st.markdown("## 🗺️ **Mapas Interactivos**")
     
     if st.session_state.gdf_analisis is None:
@@ -397,65 +745,27 @@ def render_map_tab():
             key="layer_style_select"
         )
     
+    # Visualizador (mapa estático)
+    center_lat, center_lon = st.session_state.centroid
+    visualizer = MapVisualizer(
+        center_lat=center_lat,
+        center_lon=center_lon,
+        zoom=14
+    )
+    
     with col1:
-        # Crear visualizador
-        centroid = st.session_state.gdf_analisis.unary_union.centroid
-        visualizer = MapVisualizer(
-            center_lat=centroid.y,
-            center_lon=centroid.x,
-            zoom=14
+        # Mapa pre-renderizado: se reconstruye solo con un nuevo análisis o selección
+        map_html = _render_map_html(
+            st.session_state.analysis_id,
+            map_type,
+            layer_style,
+            st.session_state.centroid,
+            st.session_state.gdf_analisis,
+            st.session_state.analisis_textura,
+            st.session_state.gdf_original,
+            st.session_state.choropleth_bins
         )
-        
-        # Crear mapa base
-        m = visualizer.create_base_map(layer=layer_style)
-        
-        # Añadir capa según tipo
-        if map_type == "Fertilidad":
-            m = visualizer.add_choropleth_layer(
-                m,
-                st.session_state.gdf_analisis,
-                column='indice_fertilidad',
-                layer_name="Fertilidad",
-                palette='fertility',
-                legend_name="Índice de Fertilidad"
-            )
-        elif map_type == "Textura" and st.session_state.analisis_textura is not None:
-            m = visualizer.add_choropleth_layer(
-                m,
-                st.session_state.analisis_textura,
-                column='adecuacion_textura',
-                layer_name="Adecuación de Textura",
-                palette='texture',
-                legend_name="Puntaje de Adecuación"
-            )
-        elif map_type == "Potencial":
-            # Añadir capa de potencial (simulada)
-            if 'potencial_cosecha' not in st.session_state.gdf_analisis.columns:
-                st.session_state.gdf_analisis['potencial_cosecha'] = np.random.uniform(
-                    10, 30, len(st.session_state.gdf_analisis)
-                )
-            
-            m = visualizer.add_choropleth_layer(
-                m,
-                st.session_state.gdf_analisis,
-                column='potencial_cosecha',
-                layer_name="Potencial de Cosecha",
-                palette='yield_potential',
-                legend_name="Ton/Ha"
-            )
-        
-        # Añadir capa de parcela original
-        if st.session_state.gdf_original is not None:
-            m = visualizer.add_parcel_layer(
-                m,
-                st.session_state.gdf_original,
-                layer_name="Parcela Original",
-                color='gray',
-                fill_opacity=0.1
-            )
-        
-        # Mostrar mapa
-        st_folium(m, width=800, height=600, returned_objects=[])
+        components.html(map_html, height=600)
     
     # Mapa estático
     st.markdown("---")
@@ -496,8 +806,12 @@ def render_map_tab():
                     )
 
 # Pestaña de fertilidad
+@fragment
 def render_fertility_tab():
     """Renderizar pestaña de fertilidad."""
+    from utils.visualization import MapVisualizer
+    
+    visualizer = MapVisualizer()
     st.markdown("## 🌱 **Análisis de Fertilidad**")
     
     if st.session_state.gdf_analisis is None:
@@ -507,16 +821,16 @@ def render_fertility_tab():
     # Gráficos de NPK
     st.markdown("### 📊 **Niveles de Nutrientes**")
     
-    if all(col in st.session_state.gdf_analisis.columns for col in ['nitrogeno', 'fosforo', 'potasio']):
+    agregados = st.session_state.agregados
+    
+    if agregados['avg_npk'] is not None:
         optimal_ranges = {
             'nitrogen': (120, 200),
             'phosphorus': (40, 80),
             'potassium': (160, 240)
         }
         
-        avg_n = st.session_state.gdf_analisis['nitrogeno'].mean()
-        avg_p = st.session_state.gdf_analisis['fosforo'].mean()
-        avg_k = st.session_state.gdf_analisis['potasio'].mean()
+        avg_n, avg_p, avg_k = agregados['avg_npk']
         
         create_npk_gauge_chart(avg_n, avg_p, avg_k, optimal_ranges)
     
@@ -537,7 +851,7 @@ def render_fertility_tab():
     with col2:
         # Gráfico de barras por zona
         fig = visualizer.create_fertility_chart(
-            st.session_state.gdf_analisis.sort_values('indice_fertilidad', ascending=False).head(10),
+            agregados['top10_fertility'],
             title="Top 10 Zonas por Fertilidad"
         )
         st.plotly_chart(fig, use_container_width=True)
@@ -545,13 +859,12 @@ def render_fertility_tab():
     # Recomendaciones de fertilización
     st.markdown("### 💡 **Recomendaciones de Fertilización**")
     
-    if all(col in st.session_state.gdf_analisis.columns 
-           for col in ['recomendacion_n', 'recomendacion_p', 'recomendacion_k']):
+    if agregados['totals_npk'] is not None:
+        total_n, total_p, total_k = agregados['totals_npk']
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            total_n = st.session_state.gdf_analisis['recomendacion_n'].sum()
             create_metric_card(
                 "Nitrógeno Requerido",
                 f"{total_n:.0f} kg",
@@ -559,7 +872,6 @@ def render_fertility_tab():
             )
         
         with col2:
-            total_p = st.session_state.gdf_analisis['recomendacion_p'].sum()
             create_metric_card(
                 "Fósforo Requerido",
                 f"{total_p:.0f} kg",
@@ -567,7 +879,6 @@ def render_fertility_tab():
             )
         
         with col3:
-            total_k = st.session_state.gdf_analisis['recomendacion_k'].sum()
             create_metric_card(
                 "Potasio Requerido",
                 f"{total_k:.0f} kg",
@@ -577,17 +888,27 @@ def render_fertility_tab():
         # Tabla de recomendaciones detalladas
         with st.expander("📋 **Ver Recomendaciones Detalladas por Zona**"):
             rec_cols = ['id_zona', 'area_ha', 'recomendacion_n', 'recomendacion_p', 'recomendacion_k', 'prioridad']
-            rec_df = st.session_state.gdf_analisis[rec_cols].copy()
-            rec_df['area_ha'] = rec_df['area_ha'].round(2)
-            
-            for col in ['recomendacion_n', 'recomendacion_p', 'recomendacion_k']:
-                rec_df[col] = rec_df[col].round(1)
+            rec_table = _arrow_table(
+                st.session_state.analysis_id,
+                tuple(rec_cols),
+                {
+                    'area_ha': 2,
+                    'recomendacion_n': 1,
+                    'recomendacion_p': 1,
+                    'recomendacion_k': 1
+                },
+                st.session_state.df_analisis
+            )
             
-            st.dataframe(rec_df, use_container_width=True, hide_index=True)
+            st.dataframe(rec_table, use_container_width=True, hide_index=True)
 
 # Pestaña de clima
+@fragment
 def render_climate_tab():
     """Renderizar pestaña de análisis climático."""
+    from utils.visualization import MapVisualizer
+    
+    visualizer = MapVisualizer()
     st.markdown("## 🌦️ **Análisis Climático**")
     
     if not st.session_state.datos_clima:
@@ -602,28 +923,28 @@ def render_climate_tab():
     with col1:
         create_metric_card(
             "Radiación Solar",
-            f"{st.session_state.datos_clima['solar_radiation']:.1f} MJ/m²/día",
+            f"{st.session_state.datos_clima.solar_radiation:.1f} MJ/m²/día",
             help_text="Radiación solar diaria promedio"
         )
     
     with col2:
         create_metric_card(
             "Precipitación",
-            f"{st.session_state.datos_clima['precipitation']:.1f} mm/día",
+            f"{st.session_state.datos_clima.precipitation:.1f} mm/día",
             help_text="Precipitación diaria promedio"
         )
     
     with col3:
         create_metric_card(
             "Temperatura",
-            f"{st.session_state.datos_clima['temperature']:.1f} °C",
+            f"{st.session_state.datos_clima.temperature:.1f} °C",
             help_text="Temperatura promedio"
         )
     
     with col4:
         create_metric_card(
             "Humedad Relativa",
-            f"{st.session_state.datos_clima['humidity']:.1f} %",
+            f"{st.session_state.datos_clima.humidity:.1f} %",
             help_text="Humedad relativa promedio"
         )
     
@@ -642,20 +963,43 @@ def render_climate_tab():
     st.markdown("---")
     st.markdown("### 💡 **Recomendaciones Climáticas**")
     
-    clima_analyzer = ClimateAnalyzer()
-    indicators = clima_analyzer.calculate_climate_indicators(
+    indicators = get_climate_analyzer().calculate_climate_indicators(
         st.session_state.datos_clima,
         st.session_state.cultivo_seleccionado
     )
     
     for indicator_name, indicator_data in indicators.items():
-        with st.expander(f"{indicator_name.replace('_', ' ').title()}: {indicator_data['status']}"):
+        with st.expander(f"{_INDICATOR_LABELS.get(indicator_name, indicator_name)}: {indicator_data['status']}"):
             st.markdown(f"**Descripción:** {indicator_data['description']}")
             st.markdown(f"**Recomendación:** {indicator_data['recommendation']}")
             if 'value' in indicator_data:
                 st.markdown(f"**Valor:** {indicator_data['value']}")
 
+# Exportaciones en segundo plano
+# Espera máxima por ejecución del script antes de volver a consultar (segundos)
+EXPORT_POLL_TIMEOUT = 5
+
+@st.cache_resource
+def _export_pool():
+    """Pool compartido para generar archivos de exportación fuera del hilo del script."""
+    return ThreadPoolExecutor(max_workers=2)
+
+def _build_excel(df: pd.DataFrame) -> bytes:
+    """Serializar el análisis a Excel (sin llamadas a Streamlit: corre en un hilo del pool)."""
+    import io
+    import importlib.util
+    
+    # xlsxwriter escribe bastante más rápido; openpyxl queda como respaldo
+    engine = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else 'openpyxl'
+    
+    excel_buffer = io.BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine=engine) as writer:
+        df.to_excel(writer, sheet_name='Análisis', index=False)
+    
+    return excel_buffer.getvalue()
+
 # Pestaña de reportes
+@fragment
 def render_reports_tab():
     """Renderizar pestaña de reportes."""
     st.markdown("## 📈 **Generación de Reportes**")
@@ -690,24 +1034,33 @@ def render_reports_tab():
     
     with col2:
         if st.button("📊 **Exportar a Excel**", use_container_width=True, icon="📊"):
-            with st.spinner("Exportando a Excel..."):
-                if st.session_state.gdf_analisis is not None:
-                    # Convertir a DataFrame
-                    df = pd.DataFrame(st.session_state.gdf_analisis.drop(columns='geometry'))
-                    
-                    # Exportar a Excel
-                    excel_buffer = io.BytesIO()
-                    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                        df.to_excel(writer, sheet_name='Análisis', index=False)
-                    
-                    excel_buffer.seek(0)
-                    
-                    create_download_button(
-                        excel_buffer.getvalue(),
-                        filename="analisis_cultivos.xlsx",
-                        button_text="📥 Descargar Excel",
-                        mime_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+            if st.session_state.gdf_analisis is not None:
+                # Generar el libro en segundo plano a partir de la copia tabular
+                st.session_state.excel_export = (
+                    st.session_state.analysis_id,
+                    _export_pool().submit(_build_excel, st.session_state.df_analisis)
+                )
+        
+        # Exportación del análisis vigente: en curso o lista para descargar
+        export = st.session_state.excel_export
+        if export is not None and export[0] == st.session_state.analysis_id:
+            future = export[1]
+            if not future.done():
+                with st.spinner("⏳ Generando Excel en segundo plano..."):
+                    wait([future], timeout=EXPORT_POLL_TIMEOUT)
+            
+            if not future.done():
+                # Sigue en curso: nueva ejecución para mostrar la descarga al terminar
+                st.rerun()
+            elif future.exception() is not None:
+                st.error(f"❌ Error exportando a Excel: {future.exception()}")
+            else:
+                create_download_button(
+                    future.result(),
+                    filename="analisis_cultivos.xlsx",
+                    button_text="📥 Descargar Excel",
+                    mime_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
     
     with col3:
         if st.button("🌐 **Exportar GeoJSON**", use_container_width=True, icon="🌐"):
@@ -729,19 +1082,51 @@ def render_reports_tab():
     if st.session_state.gdf_analisis is not None:
         preview_cols = st.multiselect(
             "Seleccionar columnas para vista previa:",
-            options=st.session_state.gdf_analisis.columns.tolist(),
-            default=['id_zona', 'area_ha', 'indice_fertilidad', 'categoria', 'prioridad']
+            options=st.session_state.df_analisis.columns.tolist(),
+            default=['id_zona', 'area_ha', 'indice_fertilidad', 'categoria', 'prioridad'],
+            key="preview_cols_select"
         )
         
         if preview_cols:
-            preview_df = st.session_state.gdf_analisis[preview_cols].copy()
-            
-            # Formatear números
-            for col in preview_df.columns:
-                if preview_df[col].dtype == 'float64':
-                    preview_df[col] = preview_df[col].round(3)
+            # Formatear números (float32 y float64) en una sola operación
+            df_analisis = st.session_state.df_analisis
+            float_cols = df_analisis[preview_cols].select_dtypes('float').columns
+            preview_table = _arrow_table(
+                st.session_state.analysis_id,
+                tuple(preview_cols),
+                dict.fromkeys(float_cols, 3),
+                df_analisis
+            )
             
-            st.dataframe(preview_df, use_container_width=True, hide_index=True)
+            st.dataframe(preview_table, use_container_width=True, hide_index=True)
+
+# Mapa de vista previa pre-renderizado
+@st.cache_data(max_entries=8, show_spinner=False)
+def _render_preview_html(upload_key, center, _gdf_original):
+    """
+    Construir el mapa Folium de la parcela y devolver su HTML.
+    
+    ``upload_key`` identifica el archivo subido; el mapa se construye una sola
+    vez por parcela en lugar de en cada rerun.
+    """
+    from utils.visualization import MapVisualizer
+    
+    visualizer = MapVisualizer(
+        center_lat=center[0],
+        center_lon=center[1],
+        zoom=14
+    )
+    
+    m = visualizer.create_base_map()
+    m = visualizer.add_parcel_layer(
+        m,
+        MapVisualizer.simplify_for_display(_gdf_original),
+        layer_name="Parcela",
+        color=colors['primary'],
+        fill_opacity=0.3
+    )
+    
+    return m.get_root().render()
 
 # Vista previa de parcela
 def render_parcel_preview():
@@ -751,25 +1136,14 @@ def render_parcel_preview():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        # Crear mapa de la parcela
+        # Mapa de la parcela (reutilizado mientras no cambie el archivo)
         if st.session_state.gdf_original is not None:
-            centroid = st.session_state.gdf_original.unary_union.centroid
-            visualizer = MapVisualizer(
-                center_lat=centroid.y,
-                center_lon=centroid.x,
-                zoom=14
-            )
-            
-            m = visualizer.create_base_map()
-            m = visualizer.add_parcel_layer(
-                m,
-                st.session_state.gdf_original,
-                layer_name="Parcela",
-                color=colors['primary'],
-                fill_opacity=0.3
+            preview_html = _render_preview_html(
+                st.session_state.upload_key,
+                st.session_state.centroid,
+                st.session_state.gdf_original
             )
-            
-            st_folium(m, width=600, height=400, returned_objects=[])
+            components.html(preview_html, height=400)
     
     with col2:
         create_info_card(
@@ -833,80 +1207,54 @@ def render_welcome_screen():
     
     with col2:
         st.markdown("### 📁 **Formatos soportados**")
-        create_info_card(
-            "Shapefile (.zip)",
-            "Archivo ZIP que contiene .shp, .shx, .dbf, .prj",
-            icon="🗺️",
-            color=colors['primary']
-        )
-        
-        create_info_card(
-            "KML/KMZ",
-            "Archivos de Google Earth/Google Maps",
-            icon="🌍",
-            color=colors['secondary']
-        )
-        
-        create_info_card(
-            "GeoJSON",
-            "Formato estándar para datos geoespaciales",
-            icon="📄",
-            color=colors['accent']
-        )
-        
-        st.markdown("---")
-        
-        create_warning_card(
-            "Recomendaciones",
-            """
+        # Formatos y recomendaciones en un único bloque HTML
+        create_info_cards(
+            [
+                {
+                    'title': "Shapefile (.zip)",
+                    'content': "Archivo ZIP que contiene .shp, .shx, .dbf, .prj",
+                    'icon': "🗺️",
+                    'color': colors['primary']
+                },
+                {
+                    'title': "KML/KMZ",
+                    'content': "Archivos de Google Earth/Google Maps",
+                    'icon': "🌍",
+                    'color': colors['secondary']
+                },
+                {
+                    'title': "GeoJSON",
+                    'content': "Formato estándar para datos geoespaciales",
+                    'icon': "📄",
+                    'color': colors['accent']
+                },
+                {
+                    'title': "Recomendaciones",
+                    'content': """
             Para mejores resultados:
             1. Use coordenadas en WGS84 (EPSG:4326)
             2. Asegure geometrías válidas
             3. Parcelas menores a 10,000 ha
             4. Conexión a internet estable
-            """
+            """,
+                    'icon': "⚠️",
+                    'color': "#FF9800"
+                }
+            ],
+            separator_before=3
         )
 
 # Footer
 def render_footer():
     """Renderizar footer de la aplicación."""
-    st.markdown("---")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown(f"""
-        <div style="text-align: center; color: {colors['text_light']};">
-            <p>🌿 <b>Analizador de Cultivos Digital Twin v2.0</b></p>
-            <p>Powered by NASA POWER API</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div style="text-align: center; color: {colors['text_light']};">
-            <p>📧 <b>Soporte:</b> soporte@agtech.com</p>
-            <p>📞 <b>Teléfono:</b> +57 1 234 5678</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div style="text-align: center; color: {colors['text_light']};">
-            <p>🔗 <b>Enlaces:</b></p>
-            <p>
-                <a href="#" style="color: {colors['primary']};">Documentación</a> | 
-                <a href="#" style="color: {colors['primary']};">API</a> | 
-                <a href="#" style="color: {colors['primary']};">GitHub</a>
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_static_html()["footer"], unsafe_allow_html=True)
 
 # Función principal
 def main():
     """Función principal de la aplicación."""
     # Inicializar session state
     init_session_state()
+    _warm_up_kernels()
     
     # Renderizar componentes
     render_header()
@@ -3,6 +3,7 @@
 Componentes reutilizables de la interfaz de usuario.
 """
 import streamlit as st
+import html
 import plotly.graph_objects as go
 import plotly.express as px
 from typing import List, Dict, Optional, Any, Tuple
@@ -40,6 +41,31 @@ def create_metric_card(
             help=help_text
         )
 
+def create_metric_cards(cards: List[Dict[str, Any]]):
+    """
+    Crear varias tarjetas métricas en un único bloque HTML (grilla CSS).
+    
+    Args:
+        cards: Lista de diccionarios con las claves de create_metric_card
+            (title, value y opcionalmente delta, delta_color, help_text)
+    """
+    cells = []
+    for card in cards:
+        delta = card.get('delta')
+        delta_html = ""
+        if delta is not None:
+            delta_class = "metric-delta inverse" if card.get('delta_color') == "inverse" else "metric-delta"
+            delta_html = f'<p class="{delta_class}">{html.escape(str(delta))}</p>'
+        
+        cells.append(
+            f'<div class="metric-card" title="{html.escape(card.get("help_text") or "")}">'
+            f'<p class="metric-title">{html.escape(str(card["title"]))}</p>'
+            f'<p class="metric-value">{html.escape(str(card["value"]))}</p>'
+            f'{delta_html}</div>'
+        )
+    
+    st.markdown(f'<div class="metric-grid">{"".join(cells)}</div>', unsafe_allow_html=True)
+
 def create_info_card(
     title: str,
     content: str,
@@ -61,7 +87,30 @@ def create_info_card(
         col = st
     
     with col:
-        st.markdown(f"""
+        st.markdown(_info_card_html(title, content, icon, color), unsafe_allow_html=True)
+
+def create_info_cards(cards: List[Dict[str, Any]], separator_before: Optional[int] = None):
+    """
+    Crear varias tarjetas informativas con un único st.markdown.
+    
+    Args:
+        cards: Lista de diccionarios con las claves de create_info_card
+            (title, content y opcionalmente icon, color)
+        separator_before: Índice de la tarjeta antes de la cual insertar una
+            línea divisoria (opcional)
+    """
+    blocks = [
+        _info_card_html(card['title'], card['content'], card.get('icon', "ℹ️"), card.get('color', "#4CAF50"))
+        for card in cards
+    ]
+    if separator_before is not None:
+        blocks.insert(separator_before, "<hr>")
+    
+    st.markdown("".join(blocks), unsafe_allow_html=True)
+
+def _info_card_html(title: str, content: str, icon: str, color: str) -> str:
+    """HTML de una tarjeta informativa."""
+    return f"""
         <div style="
             border-left: 4px solid {color};
             background-color: #f8f9fa;
@@ -77,7 +126,7 @@ def create_info_card(
                 {content}
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """
 
 def create_warning_card(
     title: str,
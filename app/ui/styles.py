@@ -3,146 +3,24 @@
 Estilos CSS personalizados para la aplicación.
 """
 import streamlit as st
+from pathlib import Path
+
+# Hoja de estilos estática (app/static/styles.css), leída una sola vez al importar
+CSS_PATH = Path(__file__).resolve().parent.parent / "static" / "styles.css"
+CUSTOM_CSS = f"<style>\n{CSS_PATH.read_text(encoding='utf-8')}</style>"
+
+# Referencia al archivo servido por Streamlit (server.enableStaticServing)
+CUSTOM_CSS_LINK = '<link rel="stylesheet" href="app/static/styles.css">'
+
+def custom_css_markup() -> str:
+    """Marcado para aplicar los estilos: enlace al archivo estático si se sirve, o CSS en línea."""
+    if st.get_option("server.enableStaticServing"):
+        return CUSTOM_CSS_LINK
+    return CUSTOM_CSS
 
 def inject_custom_css():
     """Inyectar CSS personalizado en la aplicación."""
-    st.markdown("""
-    <style>
-    /* Estilos generales */
-    .stApp {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    }
-    
-    /* Header principal */
-    .main-header {
-        background: rgba(255, 255, 255, 0.95);
-        padding: 2rem;
-        border-radius: 20px;
-        box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-        backdrop-filter: blur(10px);
-        margin-bottom: 2rem;
-    }
-    
-    /* Tarjetas métricas */
-    .metric-card {
-        background: white;
-        border-radius: 12px;
-        padding: 1.5rem;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        border-left: 4px solid #4CAF50;
-        transition: transform 0.2s;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-    }
-    
-    .metric-title {
-        color: #2C3E50;
-        font-size: 14px;
-        font-weight: 500;
-        margin-bottom: 8px;
-    }
-    
-    .metric-value {
-        color: #2E7D32;
-        font-size: 28px;
-        font-weight: 700;
-        margin: 0;
-    }
-    
-    .metric-delta {
-        color: #4CAF50;
-        font-size: 14px;
-        margin-top: 4px;
-    }
-    
-    /* Botones */
-    .stButton > button {
-        background-color: #2E7D32;
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 10px 24px;
-        font-weight: 500;
-        transition: all 0.3s;
-    }
-    
-    .stButton > button:hover {
-        background-color: #1B5E20;
-        color: white;
-        transform: translateY(-1px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-    }
-    
-    /* Pestañas */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 8px 8px 0 0;
-        padding: 10px 20px;
-        background-color: rgba(255, 255, 255, 0.8);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: white !important;
-        border-bottom: 3px solid #2E7D32;
-    }
-    
-    /* Sidebar */
-    [data-testid="stSidebar"] {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-    }
-    
-    /* Inputs */
-    .stTextInput > div > div > input,
-    .stNumberInput > div > div > input,
-    .stSelectbox > div > div > div {
-        border-radius: 8px;
-        border: 1px solid #E0E0E0;
-    }
-    
-    /* Dataframes */
-    .stDataFrame {
-        border-radius: 8px;
-        overflow: hidden;
-    }
-    
-    /* Progress bars */
-    .stProgress > div > div > div > div {
-        background-color: #4CAF50;
-    }
-    
-    /* Tooltips */
-    .stTooltip {
-        border-radius: 8px;
-    }
-    
-    /* Footer */
-    .footer {
-        text-align: center;
-        color: #666;
-        padding: 2rem;
-        margin-top: 3rem;
-        border-top: 1px solid #E0E0E0;
-    }
-    
-    /* Responsive */
-    @media (max-width: 768px) {
-        .main-header {
-            padding: 1rem;
-        }
-        
-        .metric-value {
-            font-size: 24px;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(custom_css_markup(), unsafe_allow_html=True)
 
 def create_color_palette():
     """Definir paleta de colores de la aplicación."""
@@ -6,11 +6,13 @@ import geopandas as gpd
 import pandas as pd
 import numpy as np
 import tempfile
+import hashlib
 import os
 import zipfile
 import shutil
 from typing import Optional, Tuple, List
 import logging
+import shapely
 from shapely.geometry import Polygon, MultiPolygon
 import fiona
 
@@ -21,6 +23,10 @@ class FileProcessor:
     
     SUPPORTED_EXTENSIONS = ['.zip', '.kml', '.geojson', '.shp', '.gpkg']
     
+    # Caché en disco de parcelas ya procesadas, en FlatGeobuf (binario, sin
+    # parseo de texto); opcional, desactivada si la variable está vacía
+    PARCEL_CACHE_DIR = os.getenv('PARCEL_CACHE_DIR', '')
+    
     @staticmethod
     def process_uploaded_file(uploaded_file) -> Optional[gpd.GeoDataFrame]:
         """
@@ -32,16 +38,76 @@ class FileProcessor:
         Returns:
             GeoDataFrame procesado o None
         """
+        return FileProcessor.process_file_bytes(uploaded_file.getvalue(), uploaded_file.name)
+    
+    @staticmethod
+    def process_file_bytes(
+        file_bytes: bytes,
+        file_name: str,
+        digest: Optional[str] = None
+    ) -> Optional[gpd.GeoDataFrame]:
+        """
+        Procesar el contenido de un archivo geoespacial.
+        
+        Args:
+            file_bytes: Contenido del archivo
+            file_name: Nombre del archivo (determina el formato)
+            digest: SHA-1 del contenido, si ya se calculó (clave de caché)
+            
+        Returns:
+            GeoDataFrame procesado o None
+        """
+        # Archivo ya procesado antes (clave: hash del contenido)
+        cache_path = FileProcessor._parcel_cache_path(file_bytes, digest)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                return gpd.read_file(cache_path)
+            except Exception as e:
+                logger.warning(f"Caché de parcela ilegible ({cache_path}): {e}")
+        
+        gdf = FileProcessor._read_file_bytes(file_bytes, file_name)
+        
+        if cache_path and gdf is not None and not gdf.empty:
+            FileProcessor._write_parcel_cache(cache_path, gdf)
+        
+        return gdf
+    
+    @staticmethod
+    def _parcel_cache_path(file_bytes: bytes, digest: Optional[str] = None) -> Optional[str]:
+        """Ruta de caché FlatGeobuf para un contenido de archivo."""
+        if not FileProcessor.PARCEL_CACHE_DIR:
+            return None
+        
+        if digest is None:
+            digest = hashlib.sha1(file_bytes).hexdigest()
+        return os.path.join(FileProcessor.PARCEL_CACHE_DIR, f"parcela_{digest}.fgb")
+    
+    @staticmethod
+    def _write_parcel_cache(cache_path: str, gdf: gpd.GeoDataFrame) -> None:
+        """Guardar la parcela procesada en FlatGeobuf (escritura atómica)."""
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            gdf.to_file(tmp_path, driver="FlatGeobuf")
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar caché de parcela ({cache_path}): {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    @staticmethod
+    def _read_file_bytes(file_bytes: bytes, file_name: str) -> Optional[gpd.GeoDataFrame]:
+        """Leer y limpiar el archivo según su extensión (sin caché)."""
         try:
             with tempfile.TemporaryDirectory() as tmp_dir:
-                file_path = os.path.join(tmp_dir, uploaded_file.name)
+                file_path = os.path.join(tmp_dir, file_name)
                 
                 # Guardar archivo subido
                 with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getvalue())
+                    f.write(file_bytes)
                 
                 # Procesar según extensión
-                file_ext = os.path.splitext(uploaded_file.name)[1].lower()
+                file_ext = os.path.splitext(file_name)[1].lower()
                 
                 if file_ext == '.kml':
                     gdf = gpd.read_file(file_path, driver='KML')
@@ -162,6 +228,27 @@ class FileProcessor:
             logger.error(f"Error calculando área: {e}")
             return 0.0
     
+    @staticmethod
+    def _zone_areas_ha(gdf: gpd.GeoDataFrame) -> np.ndarray:
+        """Área de cada geometría en hectáreas, proyectando el GeoDataFrame una sola vez."""
+        crs_options = ['EPSG:3857', 'EPSG:5367', 'EPSG:3116', 'EPSG:32718', 'EPSG:32719']
+        
+        for crs_code in crs_options:
+            try:
+                return gdf.geometry.to_crs(crs_code).area.to_numpy() / 10000
+            except Exception:
+                continue
+        
+        # Fallback: cálculo aproximado por geometría
+        return np.array([
+            FileProcessor.calculate_area(gdf.iloc[[idx]]) for idx in range(len(gdf))
+        ])
+    
+    @staticmethod
+    def union_geometry(gdf: gpd.GeoDataFrame):
+        """Unir todas las geometrías en una sola pasada de GEOS (shapely 2)."""
+        return shapely.union_all(np.asarray(gdf.geometry.values))
+    
     @staticmethod
     def divide_into_zones(
         gdf: gpd.GeoDataFrame,
@@ -184,7 +271,7 @@ class FileProcessor:
                 return gdf
             
             # Unir todas las geometrías en una
-            union_geom = gdf.unary_union
+            union_geom = FileProcessor.union_geometry(gdf)
             
             if not union_geom.is_valid:
                 union_geom = union_geom.buffer(0)
@@ -207,53 +294,36 @@ class FileProcessor:
             if width < 0.00001 or height < 0.00001:
                 return gdf
             
-            # Crear cuadrícula
-            zones = []
-            zone_id = 1
-            
-            for i in range(n_rows):
-                for j in range(n_cols):
-                    if zone_id > n_zones:
-                        break
-                    
-                    cell_minx = minx + (j * width)
-                    cell_maxx = minx + ((j + 1) * width)
-                    cell_miny = miny + (i * height)
-                    cell_maxy = miny + ((i + 1) * height)
-                    
-                    cell_poly = Polygon([
-                        (cell_minx, cell_miny),
-                        (cell_maxx, cell_miny),
-                        (cell_maxx, cell_maxy),
-                        (cell_minx, cell_maxy)
-                    ])
-                    
-                    if cell_poly.is_valid:
-                        intersection = union_geom.intersection(cell_poly)
-                        
-                        if not intersection.is_empty and intersection.area > 0:
-                            # Manejar MultiPolygon
-                            if intersection.geom_type == 'MultiPolygon':
-                                for poly in intersection.geoms:
-                                    if poly.area > 0:
-                                        zones.append({
-                                            'id_zona': zone_id,
-                                            'geometry': poly
-                                        })
-                                        zone_id += 1
-                            else:
-                                zones.append({
-                                    'id_zona': zone_id,
-                                    'geometry': intersection
-                                })
-                                zone_id += 1
-            
-            if zones:
-                zones_gdf = gpd.GeoDataFrame(zones, crs=gdf.crs)
-                # Calcular área de cada zona
-                zones_gdf['area_ha'] = zones_gdf.geometry.apply(
-                    lambda g: FileProcessor.calculate_area(gpd.GeoDataFrame([g], columns=['geometry'], crs=zones_gdf.crs))
+            # Crear cuadrícula completa, fila por fila
+            cell_idx = np.arange(n_rows * n_cols)
+            cell_i, cell_j = np.divmod(cell_idx, n_cols)
+            cells = shapely.box(
+                minx + cell_j * width,
+                miny + cell_i * height,
+                minx + (cell_j + 1) * width,
+                miny + (cell_i + 1) * height
+            )
+            
+            # Intersección de todas las celdas en una sola llamada vectorizada
+            intersections = shapely.intersection(cells, union_geom)
+            
+            # Separar MultiPolygon en sus partes y descartar piezas sin área
+            parts, part_cell = shapely.get_parts(intersections, return_index=True)
+            has_area = shapely.area(parts) > 0
+            parts, part_cell = parts[has_area], part_cell[has_area]
+            
+            # No abrir celdas nuevas una vez alcanzadas n_zones zonas (las partes
+            # de una misma celda se conservan juntas)
+            parts = parts[np.searchsorted(part_cell, part_cell) < n_zones]
+            
+            if len(parts):
+                zones_gdf = gpd.GeoDataFrame(
+                    {'id_zona': np.arange(1, len(parts) + 1)},
+                    geometry=parts,
+                    crs=gdf.crs
                 )
+                # Calcular área de cada zona
+                zones_gdf['area_ha'] = FileProcessor._zone_areas_ha(zones_gdf)
                 # Filtrar zonas muy pequeñas
                 zones_gdf = zones_gdf[zones_gdf['area_ha'] >= min_area]
                 return zones_gdf.reset_index(drop=True)
@@ -300,7 +370,8 @@ class FileProcessor:
             String GeoJSON
         """
         try:
-            return gdf.to_json()
+            # Sin campo "id" redundante y en WGS84, como exige el estándar GeoJSON
+            return gdf.to_json(drop_id=True, to_wgs84=gdf.crs is not None)
         except Exception as e:
             logger.error(f"Error exportando GeoJSON: {e}")
             return '{"type": "FeatureCollection", "features": []}'
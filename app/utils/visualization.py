@@ -11,10 +11,11 @@ import matplotlib.patches as mpatches
 from matplotlib.colors import LinearSegmentedColormap
 import io
 import base64
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Tuple, Any, Union
 import pandas as pd
 import numpy as np
 import geopandas as gpd
+import shapely
 from shapely.geometry import Point, Polygon
 import logging
 
@@ -34,6 +35,15 @@ class MapVisualizer:
         'climate': ['#ffffcc', '#a1dab4', '#41b6c4', '#2c7fb8', '#253494']
     }
     
+    # Campos mostrados en popups/tooltips y sus etiquetas
+    POPUP_FIELDS = {
+        'id_zona': 'ID Zona',
+        'area_ha': 'Área (ha)',
+        'indice_fertilidad': 'Fertilidad',
+        'categoria': 'Categoría'
+    }
+    POPUP_DECIMALS = {'area_ha': 2, 'indice_fertilidad': 3}
+    
     # Capas de mapas base
     BASE_LAYERS = {
         'Esri Satellite': {
@@ -123,6 +133,31 @@ class MapVisualizer:
         
         return m
     
+    @staticmethod
+    def simplify_for_display(
+        gdf: gpd.GeoDataFrame,
+        tolerance: float = 1e-5,
+        precision: int = 5
+    ) -> gpd.GeoDataFrame:
+        """
+        Simplificar geometrías y recortar decimales antes de enviarlas al mapa.
+        
+        Args:
+            gdf: GeoDataFrame con geometrías
+            tolerance: Tolerancia de simplificación (unidades del CRS)
+            precision: Decimales conservados en las coordenadas
+            
+        Returns:
+            Copia del GeoDataFrame con geometrías reducidas
+        """
+        if gdf.empty:
+            return gdf
+        
+        geoms = shapely.simplify(np.asarray(gdf.geometry.values), tolerance, preserve_topology=True)
+        geoms = shapely.set_precision(geoms, 10.0 ** -precision)
+        
+        return gdf.set_geometry(gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs))
+    
     def add_parcel_layer(
         self,
         m: folium.Map,
@@ -147,41 +182,28 @@ class MapVisualizer:
         if gdf.empty:
             return m
         
-        # Crear grupo de capa
-        feature_group = folium.FeatureGroup(name=layer_name)
-        
-        for idx, row in gdf.iterrows():
-            # Crear popup informativo
-            popup_html = f"""
-            <div style="font-family: Arial; font-size: 12px;">
-                <b>{layer_name} {idx + 1}</b><br>
-                <b>Área:</b> {row.get('area_ha', 0):.2f} ha<br>
-                <b>ID Zona:</b> {row.get('id_zona', 'N/A')}<br>
-            """
-            
-            # Añadir información adicional si existe
-            if 'indice_fertilidad' in row:
-                popup_html += f"<b>Fertilidad:</b> {row['indice_fertilidad']:.3f}<br>"
-            if 'categoria' in row:
-                popup_html += f"<b>Categoría:</b> {row['categoria']}<br>"
-            
-            popup_html += "</div>"
-            
-            # Añadir geometría
-            folium.GeoJson(
-                row.geometry.__geo_interface__,
-                style_function=lambda x, color=color, fill_opacity=fill_opacity: {
-                    'fillColor': color,
-                    'color': 'black',
-                    'weight': 2,
-                    'fillOpacity': fill_opacity,
-                    'opacity': 0.8
-                },
-                popup=folium.Popup(popup_html, max_width=300),
-                tooltip=f"{layer_name} {idx + 1}"
-            ).add_to(feature_group)
+        # Una única capa GeoJSON para todas las geometrías (no una por fila)
+        fields = [col for col in self.POPUP_FIELDS if col in gdf.columns]
+        data = gdf[fields + [gdf.geometry.name]].round(self.POPUP_DECIMALS)
+        
+        folium.GeoJson(
+            data,
+            name=layer_name,
+            style_function=lambda x, color=color, fill_opacity=fill_opacity: {
+                'fillColor': color,
+                'color': 'black',
+                'weight': 2,
+                'fillOpacity': fill_opacity,
+                'opacity': 0.8
+            },
+            popup=folium.GeoJsonPopup(
+                fields=fields,
+                aliases=[self.POPUP_FIELDS[col] for col in fields],
+                max_width=300
+            ) if fields else None,
+            tooltip=layer_name
+        ).add_to(m)
         
-        feature_group.add_to(m)
         return m
     
     def add_choropleth_layer(
@@ -192,7 +214,7 @@ class MapVisualizer:
         layer_name: str,
         palette: str = 'fertility',
         legend_name: str = "Valor",
-        bins: int = 7
+        bins: Union[int, Sequence[float]] = 7
     ) -> folium.Map:
         """
         Añadir capa coroplética al mapa.
@@ -204,7 +226,7 @@ class MapVisualizer:
             layer_name: Nombre de la capa
             palette: Nombre de la paleta de colores
             legend_name: Nombre para la leyenda
-            bins: Número de intervalos
+            bins: Número de intervalos o bordes ya calculados
             
         Returns:
             Mapa actualizado
@@ -223,9 +245,16 @@ class MapVisualizer:
         vmin = values.min()
         vmax = values.max()
         
+        # Propiedades para hover/popup (redondeadas); la geometría viaja una sola vez
+        fields = list(dict.fromkeys(
+            col for col in ('id_zona', column, 'area_ha', 'categoria') if col in gdf.columns
+        ))
+        aliases = [legend_name if col == column else self.POPUP_FIELDS[col] for col in fields]
+        geo_data = gdf[fields + [gdf.geometry.name]].round({**self.POPUP_DECIMALS, column: 3})
+        
         # Crear capa coroplética
         choropleth = folium.Choropleth(
-            geo_data=gdf.__geo_interface__,
+            geo_data=geo_data.__geo_interface__,
             data=gdf,
             columns=['id_zona', column],
             key_on='feature.properties.id_zona',
@@ -239,45 +268,9 @@ class MapVisualizer:
             highlight=True
         ).add_to(m)
         
-        # Añadir tooltips
-        style_function = lambda x: {
-            'fillColor': '#ffffff',
-            'color': '#000000',
-            'fillOpacity': 0.0,
-            'weight': 0.0
-        }
-        
-        highlight_function = lambda x: {
-            'fillColor': '#000000',
-            'color': '#000000',
-            'fillOpacity': 0.50,
-            'weight': 0.1
-        }
-        
-        # Añadir información en hover
-        for idx, row in gdf.iterrows():
-            html = f"""
-            <div style="font-family: Arial; font-size: 12px;">
-                <b>Zona {row.get('id_zona', idx+1)}</b><br>
-                <b>{legend_name}:</b> {row[column]:.3f}<br>
-                <b>Área:</b> {row.get('area_ha', 0):.2f} ha<br>
-            """
-            
-            if 'categoria' in row:
-                html += f"<b>Categoría:</b> {row['categoria']}<br>"
-            
-            html += "</div>"
-            
-            iframe = folium.IFrame(html=html, width=200, height=100)
-            popup = folium.Popup(iframe, max_width=300)
-            
-            folium.GeoJson(
-                row.geometry.__geo_interface__,
-                style_function=style_function,
-                highlight_function=highlight_function,
-                tooltip=folium.Tooltip(f"Zona {row.get('id_zona', idx+1)}: {row[column]:.3f}"),
-                popup=popup
-            ).add_to(choropleth.geojson)
+        # Tooltips y popups sobre la misma capa GeoJSON de la coroplética
+        folium.GeoJsonTooltip(fields=fields[:2], aliases=aliases[:2]).add_to(choropleth.geojson)
+        folium.GeoJsonPopup(fields=fields, aliases=aliases, max_width=300).add_to(choropleth.geojson)
         
         return m
     
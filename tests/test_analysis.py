@@ -45,3 +45,168 @@ def test_npk_recommendations():
     assert 'phosphorus' in recommendations
     assert 'potassium' in recommendations
     assert recommendations['nitrogen']['deficit'] > 0
+
+
+def _make_zones(n=9):
+    """Cuadrícula simple de zonas para pruebas."""
+    import geopandas as gpd
+    from shapely.geometry import box
+    geoms = [box(i, j, i + 1, j + 1) for i in range(3) for j in range(n // 3)]
+    return gpd.GeoDataFrame({'id_zona': range(1, len(geoms) + 1)}, geometry=geoms, crs="EPSG:4326")
+
+def test_analyze_zones_matches_scalar_methods():
+    """Test de consistencia entre el análisis por lote y los métodos escalares."""
+    analyzer = SoilAnalyzer("PALMA_ACEITERA", "MAYO")
+    result = analyzer.analyze_zones(_make_zones())
+    
+    for _, row in result.iterrows():
+        fertility = analyzer.calculate_fertility_index(
+            nitrogen=row['nitrogeno'],
+            phosphorus=row['fosforo'],
+            potassium=row['potasio'],
+            organic_matter=row['materia_organica'],
+            ph=row['ph'],
+            ndvi=row['ndvi']
+        )
+        recommendations = analyzer.calculate_npk_recommendations(
+            nitrogen=row['nitrogeno'],
+            phosphorus=row['fosforo'],
+            potassium=row['potasio'],
+            ndvi=row['ndvi'],
+            organic_matter=row['materia_organica'],
+            ph=row['ph']
+        )
+        
+        # La ruta escalar cuantiza las entradas a 3 decimales (caché)
+        assert row['indice_fertilidad'] == pytest.approx(fertility['index'], abs=1e-4)
+        assert row['categoria'] == fertility['category']
+        assert row['prioridad'] == fertility['priority']
+        assert row['recomendacion_n'] == pytest.approx(recommendations['nitrogen']['recommendation'])
+        assert row['recomendacion_p'] == pytest.approx(recommendations['phosphorus']['recommendation'])
+        assert row['recomendacion_k'] == pytest.approx(recommendations['potassium']['recommendation'])
+
+def test_zones_core_matches_numpy_batch():
+    """Test de equivalencia entre el núcleo por zonas y la ruta NumPy."""
+    from app.core.analysis import _zones_core
+    
+    analyzer = SoilAnalyzer("CACAO", "ABRIL")
+    params = analyzer.params
+    rng = np.random.default_rng(0)
+    n = rng.normal(140, 30, 50)
+    p = rng.normal(45, 10, 50)
+    k = rng.normal(160, 30, 50)
+    om = rng.normal(4.0, 1.0, 50)
+    ph = rng.normal(6.0, 0.8, 50)
+    ndvi = rng.uniform(0.4, 0.8, 50)
+    
+    core = _zones_core(
+        n, p, k, om, ph, ndvi,
+        params.nitrogeno_optimo, params.fosforo_optimo, params.potasio_optimo,
+        params.materia_organica_optima, params.ph_optimo,
+        analyzer.MONTH_FACTORS["ABRIL"], analyzer._FERT_THRESH
+    )
+    fertility_index, tier, rec_n, rec_p, rec_k = core
+    
+    np.testing.assert_allclose(
+        np.vstack([fertility_index, rec_n, rec_p, rec_k]),
+        np.vstack(analyzer._zones_batch(n, p, k, om, ph, ndvi))
+    )
+    np.testing.assert_array_equal(
+        tier, np.searchsorted(analyzer._FERT_THRESH, fertility_index, side='right')
+    )
+
+def test_analyze_zones_reproducible_with_seed():
+    """Test de reproducibilidad de los datos sintéticos por semilla."""
+    analyzer = SoilAnalyzer("BANANO", "JUNIO")
+    zones = _make_zones()
+    
+    first = analyzer.analyze_zones(zones, seed=7)
+    second = analyzer.analyze_zones(zones, seed=7)
+    other = analyzer.analyze_zones(zones, seed=8)
+    
+    np.testing.assert_array_equal(first['nitrogeno'], second['nitrogeno'])
+    assert not np.array_equal(first['nitrogeno'], other['nitrogeno'])
+
+def test_classify_fertility_batch_matches_scalar():
+    """Test de la clasificación vectorizada en los umbrales."""
+    analyzer = SoilAnalyzer("PALMA_ACEITERA", "ENERO")
+    values = np.array([0.0, 0.2499, 0.25, 0.40, 0.55, 0.6999, 0.70, 0.85, 1.0])
+    
+    categories, priorities = analyzer._classify_fertility_batch(values)
+    
+    for value, category, priority in zip(values, categories, priorities):
+        assert (category, priority) == analyzer._classify_fertility(value)
+
+def test_fertility_index_cache_shared_between_instances():
+    """Test de la caché del índice de fertilidad entre instancias."""
+    first = SoilAnalyzer("CACAO", "MARZO")
+    second = SoilAnalyzer("CACAO", "MARZO")
+    
+    before = SoilAnalyzer.get_cache_stats()['hits']
+    a = first.calculate_fertility_index(140.0001, 45, 160, 4.0, 6.0, 0.6)
+    b = second.calculate_fertility_index(140.0002, 45, 160, 4.0, 6.0, 0.6)
+    
+    assert a == b
+    assert SoilAnalyzer.get_cache_stats()['hits'] == before + 1
+
+def test_validate_inputs_rejects_non_finite():
+    """Test de validación de entradas no finitas en el análisis por lote."""
+    with pytest.raises(ValueError, match="fosforo"):
+        SoilAnalyzer._validate_inputs(
+            nitrogeno=np.array([150.0, 160.0]),
+            fosforo=np.array([60.0, np.nan])
+        )
+
+def test_crop_params_array_matches_dataclasses():
+    """Test del arreglo plano de parámetros frente a los dataclasses."""
+    for crop, params in SoilAnalyzer.CROP_PARAMETERS.items():
+        row = SoilAnalyzer.CROP_PARAMS_ARR[SoilAnalyzer.CROP_IDX[crop]]
+        assert row[2] == params.nitrogeno_optimo
+        assert row[11] == params.ph_optimo
+
+def test_analyze_zones_shares_geometries_with_input():
+    """Test de copia superficial: no se clonan geometrías ni se modifica la entrada."""
+    gdf = _make_zones()
+    result = SoilAnalyzer("BANANO", "JUNIO").analyze_zones(gdf)
+    
+    assert np.shares_memory(np.asarray(result.geometry.values), np.asarray(gdf.geometry.values))
+    assert 'indice_fertilidad' not in gdf.columns
+
+def test_yield_potential_vectorized_matches_scalar():
+    """Test del potencial de cosecha por lote frente a la versión escalar."""
+    from app.core.climate import ClimateData
+    analyzer = SoilAnalyzer("PALMA_ACEITERA", "MAYO")
+    climate = ClimateData(18.0, 5.0, 27.0, 3.0, 75.0, 4.0)
+    result = analyzer.analyze_zones(_make_zones(), climate_data=climate)
+    
+    for _, row in result.iterrows():
+        expected = analyzer.calculate_yield_potential(
+            row['indice_fertilidad'], 18.0, 5.0, 3.0, row['ndvi'], 27.0
+        )
+        assert row['rendimiento_potencial'] == pytest.approx(expected)
+
+def test_analyze_zones_df_matches_geodataframe_path():
+    """Test de la fase numérica sobre centroides frente a analyze_zones."""
+    import pandas as pd
+    gdf = _make_zones()
+    analyzer = SoilAnalyzer("CACAO", "ABRIL")
+    # Centro de cada celda unitaria de la cuadrícula
+    centroids = pd.DataFrame({'x': gdf.bounds.minx + 0.5, 'y': gdf.bounds.miny + 0.5})
+    
+    numeric = analyzer.analyze_zones_df(centroids)
+    result = analyzer.analyze_zones(gdf)
+    
+    pd.testing.assert_frame_equal(numeric, pd.DataFrame(result[numeric.columns]))
+
+def test_analyze_zones_df_float32_outputs():
+    """Test de columnas de salida en float32 y etiquetas categóricas."""
+    import pandas as pd
+    analyzer = SoilAnalyzer("CACAO", "ABRIL")
+    centroids = pd.DataFrame({'x': [0.5, 1.5], 'y': [0.5, 0.5]})
+    
+    numeric = analyzer.analyze_zones_df(centroids)
+    
+    assert numeric['indice_fertilidad'].dtype == np.float32
+    assert numeric['recomendacion_n'].dtype == np.float32
+    assert isinstance(numeric['categoria'].dtype, pd.CategoricalDtype)
+    assert isinstance(numeric['prioridad'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,377 @@
+# tests/test_climate.py
+import pytest
+import numpy as np
+import pandas as pd
+from app.core.climate import ClimateAnalyzer, ClimateData
+
+def test_current_climate_batch_dedupes_nearby_points(monkeypatch):
+    """Test de consulta por lote: orden preservado y puntos cercanos agrupados."""
+    analyzer = ClimateAnalyzer()
+    calls = []
+    
+    def fake_current_climate(lat, lon, month):
+        calls.append((lat, lon, month))
+        return ClimateData(lat, lon, 25.0, 2.0, 70.0, 4.0)
+    
+    monkeypatch.setattr(analyzer, 'get_current_climate', fake_current_climate)
+    
+    coords = [(4.001, -74.001), (5.0, -75.0), (4.002, -74.002)]
+    result = analyzer.get_current_climate_batch(coords, "ENERO")
+    
+    assert len(calls) == 2
+    assert [r.solar_radiation for r in result] == [4.0, 5.0, 4.0]
+
+def test_historical_climate_served_from_disk_cache(tmp_path, monkeypatch):
+    """Test de caché en disco: segunda consulta cercana no llama a la API."""
+    analyzer = ClimateAnalyzer(cache_dir=str(tmp_path))
+    calls = []
+    
+    def fake_request_csv(lat, lon, start_date, end_date):
+        calls.append((start_date, end_date))
+        return pd.DataFrame({
+            'YEAR': [2020], 'MO': [1], 'DY': [15],
+            **{param: [1.0] for param in ClimateAnalyzer.POWER_PARAMETERS.values()}
+        })
+    
+    monkeypatch.setattr(analyzer, '_request_power_csv', fake_request_csv)
+    
+    first = analyzer.get_historical_climate(4.1, -74.1, years=2)
+    assert len(calls) == 1
+    
+    second = analyzer.get_historical_climate(4.2, -74.2, years=2)
+    assert len(calls) == 1
+    assert second == first
+    assert len(list(tmp_path.iterdir())) == 1
+
+def test_monthly_means_groups_by_month_and_skips_missing():
+    """Test de promedios mensuales a partir de la serie diaria de un rango."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    daily = pd.DataFrame({
+        'MO': [1, 1, 2, 12],
+        **{param: [2.0, 4.0, -999.0, 10.0] for param in ClimateAnalyzer.POWER_PARAMETERS.values()}
+    })
+    
+    means = analyzer._monthly_means(daily)['temperature']
+    
+    assert len(means) == 12
+    assert means[0] == 3.0
+    assert means[1] == 0.0
+    assert means[11] == 10.0
+
+def test_parse_climate_data_skips_missing_values():
+    """Test del promedio diario sin valores faltantes (-999)."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    data = {'properties': {'parameter': {
+        param: {'20240101': 2.0, '20240102': -999.0, '20240103': 4.0}
+        for param in ClimateAnalyzer.POWER_PARAMETERS.values()
+    }}}
+    
+    climate = analyzer._parse_climate_data(data)
+    
+    assert climate.temperature == 3.0
+    assert isinstance(climate.eto, float)
+
+def test_historical_climate_falls_back_to_yearly_requests(monkeypatch):
+    """Test del respaldo por año cuando el rango completo es rechazado."""
+    import requests
+    analyzer = ClimateAnalyzer(cache_dir="")
+    requested = []
+    
+    def reject_range(lat, lon, start_date, end_date):
+        raise requests.HTTPError("422 rango demasiado largo")
+    
+    async def fake_request_async(session, lat, lon, start_date, end_date):
+        requested.append(start_date)
+        return {'properties': {'parameter': {
+            param: {f"{start_date[:4]}0301": 6.0}
+            for param in ClimateAnalyzer.POWER_PARAMETERS.values()
+        }}}
+    
+    monkeypatch.setattr(analyzer, '_request_power_csv', reject_range)
+    monkeypatch.setattr(analyzer, '_request_power_async', fake_request_async)
+    
+    result = analyzer.get_historical_climate(4.0, -74.0, years=3)
+    
+    assert len(requested) == 3
+    assert result['temperature'][2] == 6.0
+
+def test_current_climate_cached_until_ttl_expires(tmp_path, monkeypatch):
+    """Test de caché del clima actual con vigencia de 24 h."""
+    import os
+    analyzer = ClimateAnalyzer(cache_dir=str(tmp_path))
+    calls = []
+    
+    def fake_request(lat, lon, start_date, end_date, fields=None):
+        calls.append(start_date)
+        return {'properties': {'parameter': {
+            param: {start_date: 5.0}
+            for param in ClimateAnalyzer.POWER_PARAMETERS.values()
+        }}}
+    
+    monkeypatch.setattr(analyzer, '_request_power', fake_request)
+    monkeypatch.setattr(analyzer, '_climate_cache_ttl', lambda end_date: 60)
+    
+    first = analyzer.get_current_climate(4.0001, -74.0001, "MARZO")
+    second = analyzer.get_current_climate(4.0002, -74.0002, "MARZO")
+    assert len(calls) == 1
+    assert second == first
+    
+    (cache_file,) = tmp_path.iterdir()
+    os.utime(cache_file, (0, 0))
+    analyzer.get_current_climate(4.0, -74.0, "MARZO")
+    assert len(calls) == 2
+
+def test_disk_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    """Test del límite de la caché en disco: se elimina la entrada de uso más antiguo."""
+    import os
+    analyzer = ClimateAnalyzer(cache_dir=str(tmp_path))
+    monkeypatch.setattr(analyzer, 'CACHE_MAX_ENTRIES', 2)
+    
+    paths = [str(tmp_path / f"clima_{i}.json") for i in range(3)]
+    analyzer._write_cache(paths[0], {'i': 0})
+    analyzer._write_cache(paths[1], {'i': 1})
+    os.utime(paths[0], (100, 100))
+    os.utime(paths[1], (200, 200))
+    
+    # Leer la primera la convierte en la de uso más reciente
+    assert analyzer._read_cache(paths[0]) == {'i': 0}
+    analyzer._write_cache(paths[2], {'i': 2})
+    
+    assert sorted(os.listdir(tmp_path)) == ["clima_0.json", "clima_2.json"]
+
+def test_async_session_reused_until_closed():
+    """Test de la sesión aiohttp persistente."""
+    import asyncio
+    
+    async def scenario():
+        async with ClimateAnalyzer(cache_dir="") as analyzer:
+            first = await analyzer._get_aio_session()
+            assert await analyzer._get_aio_session() is first
+        assert first.closed
+        assert analyzer._aio_session is None
+    
+    asyncio.run(scenario())
+
+def test_async_session_closed_when_loop_changes():
+    """Test de cierre de la sesión aiohttp ligada a un loop anterior."""
+    import asyncio
+    
+    analyzer = ClimateAnalyzer(cache_dir="")
+    first = asyncio.run(analyzer._get_aio_session())
+    
+    async def second_loop():
+        second = await analyzer._get_aio_session()
+        assert second is not first
+        assert first.closed
+        await analyzer.aclose()
+    
+    asyncio.run(second_loop())
+
+def test_historical_by_year_uses_persistent_session(monkeypatch):
+    """Test del respaldo por años: reutiliza la sesión aiohttp persistente."""
+    import asyncio
+    sessions = []
+    
+    async def fake_request(session, lat, lon, start_date, end_date):
+        sessions.append(session)
+        return {'properties': {'parameter': {
+            param: {start_date: 1.0}
+            for param in ClimateAnalyzer.POWER_PARAMETERS.values()
+        }}}
+    
+    async def scenario():
+        async with ClimateAnalyzer(cache_dir="") as analyzer:
+            monkeypatch.setattr(analyzer, '_request_power_async', fake_request)
+            _, failed = await analyzer._historical_by_year_async(4.0, -74.0, 2020, 2022)
+            assert failed == 0
+            assert sessions == [analyzer._aio_session] * 2
+            assert not analyzer._aio_session.closed
+    
+    asyncio.run(scenario())
+
+def test_month_to_number():
+    """Test de conversión de nombre de mes a número."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    assert analyzer._month_to_number("ENERO") == 1
+    assert analyzer._month_to_number("DICIEMBRE") == 12
+    assert analyzer._month_to_number("marzo") == 3
+    assert analyzer._month_to_number("OTRO") == 1
+
+@pytest.mark.parametrize("precipitation, crop, expected", [
+    (3.0, 'PALMA_ACEITERA', 'BAJA'),
+    (3.0, 'CACAO', 'ÓPTIMA'),
+    (10.0, 'PALMA_ACEITERA', 'ÓPTIMA'),
+    (10.0, 'BANANO', 'ALTA'),
+])
+def test_climate_indicators_thresholds(precipitation, crop, expected):
+    """Test de umbrales de indicadores climáticos por cultivo."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    climate = ClimateData(22.0, precipitation, 18.0, 2.0, 70.0, precipitation)
+    
+    indicators = analyzer.calculate_climate_indicators(climate, crop)
+    
+    assert indicators['precipitation']['status'] == expected
+    assert indicators['solar_radiation']['status'] == 'ÓPTIMA'
+    assert indicators['temperature']['status'] == 'ÓPTIMA'
+    assert indicators['water_balance']['status'] == 'BALANCEADO'
+
+def test_climate_indicators_are_plain_dicts():
+    """Test de indicadores serializables y sin estado compartido entre llamadas."""
+    import json
+    analyzer = ClimateAnalyzer(cache_dir="")
+    climate = ClimateData(22.0, 5.0, 18.0, 2.0, 70.0, 5.0)
+    
+    indicators = analyzer.calculate_climate_indicators(climate, "PALMA_ACEITERA")
+    json.dumps(indicators)
+    indicators['solar_radiation']['value'] = "22.0 MJ/m²/día"
+    
+    again = analyzer.calculate_climate_indicators(climate, "PALMA_ACEITERA")
+    assert 'value' not in again['solar_radiation']
+
+def test_climate_indicators_batch_matches_scalar():
+    """Test de indicadores por lote frente a la versión escalar."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    rng = np.random.default_rng(1)
+    n = 40
+    fields = {
+        'solar_radiation': rng.uniform(8, 26, n),
+        'precipitation': rng.uniform(1, 12, n),
+        'temperature': rng.uniform(14, 36, n),
+        'eto': rng.uniform(1, 8, n)
+    }
+    crops = rng.choice(['PALMA_ACEITERA', 'CACAO', 'BANANO'], n)
+    
+    batch = analyzer.calculate_climate_indicators_batch(fields, crops)
+    
+    for i in range(n):
+        climate = ClimateData(
+            fields['solar_radiation'][i], fields['precipitation'][i],
+            fields['temperature'][i], 2.0, 70.0, fields['eto'][i]
+        )
+        scalar = analyzer.calculate_climate_indicators(climate, crops[i])
+        for key, statuses in batch.items():
+            assert statuses[i] == scalar[key]['status']
+
+def test_request_power_parses_raw_response_body(monkeypatch):
+    """Test del parseo de la respuesta a partir de los bytes del cuerpo."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    
+    class FakeResponse:
+        content = b'{"properties": {"parameter": {"T2M": {"20240101": 25.5}}}}'
+        
+        def raise_for_status(self):
+            pass
+    
+    monkeypatch.setattr(analyzer.session, 'get', lambda url, params, timeout: FakeResponse())
+    
+    data = analyzer._request_power(4.0, -74.0, "20240101", "20240101")
+    
+    assert data['properties']['parameter']['T2M']['20240101'] == 25.5
+
+def test_request_power_csv_skips_header(monkeypatch):
+    """Test del parseo de la respuesta CSV con bloque de cabecera."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    
+    class FakeResponse:
+        text = (
+            "-BEGIN HEADER-\n"
+            "NASA/POWER Source Native Resolution Daily Data\n"
+            "-END HEADER-\n"
+            "YEAR,MO,DY,T2M,PRECTOTCORR\n"
+            "2020,1,1,25.1,3.2\n"
+            "2020,1,2,26.3,-999.0\n"
+        )
+        
+        def raise_for_status(self):
+            pass
+    
+    monkeypatch.setattr(analyzer.session, 'get', lambda url, params, timeout: FakeResponse())
+    
+    daily = analyzer._request_power_csv(4.0, -74.0, "20200101", "20200102")
+    
+    assert list(daily.columns) == ['YEAR', 'MO', 'DY', 'T2M', 'PRECTOTCORR']
+    assert daily['T2M'].tolist() == [25.1, 26.3]
+
+def test_current_climate_requests_only_needed_parameters(monkeypatch):
+    """Test de consulta parcial: solo se piden los parámetros indicados."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    requested = []
+    
+    def fake_get(url, params, timeout):
+        requested.append(params['parameters'])
+        
+        class FakeResponse:
+            content = b'{"properties": {"parameter": {"PRECTOTCORR": {"20240101": 7.0}}}}'
+            
+            def raise_for_status(self):
+                pass
+        
+        return FakeResponse()
+    
+    monkeypatch.setattr(analyzer.session, 'get', fake_get)
+    
+    climate = analyzer.get_current_climate(4.0, -74.0, "ENERO", params_needed=['precipitation'])
+    
+    assert requested == ['PRECTOTCORR']
+    assert climate.precipitation == 7.0
+    assert climate.temperature == analyzer._get_default_climate_data().temperature
+
+def test_power_params_include_api_key_and_defaults():
+    """Test de los parámetros de consulta con y sin clave API."""
+    params = ClimateAnalyzer(api_key="clave", cache_dir="")._power_params(4.0, -74.0, "20240101", "20240131")
+    
+    assert params['api_key'] == "clave"
+    assert params['community'] == "ag"
+    assert params['parameters'] == "ALLSKY_SFC_SW_DWN,PRECTOTCORR,T2M,WS10M,RH2M,ETO"
+    assert 'api_key' not in ClimateAnalyzer(cache_dir="")._power_params(4.0, -74.0, "20240101", "20240131")
+
+def test_mean_rejects_series_without_valid_values():
+    """Test del promedio diario sin faltantes y con todos los valores faltantes."""
+    assert ClimateAnalyzer._mean({'20240101': 1.0, '20240102': 2.0}) == 1.5
+    with pytest.raises(ValueError):
+        ClimateAnalyzer._mean({'20240101': -999.0})
+    with pytest.raises(ValueError):
+        ClimateAnalyzer._mean({})
+
+def test_requests_use_timeout_and_retries(monkeypatch):
+    """Test de límite de espera y reintentos en las peticiones HTTP."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    timeouts = []
+    
+    class FakeResponse:
+        content = b'{"properties": {"parameter": {}}}'
+        
+        def raise_for_status(self):
+            pass
+    
+    def fake_get(url, params, timeout):
+        timeouts.append(timeout)
+        return FakeResponse()
+    
+    monkeypatch.setattr(analyzer.session, 'get', fake_get)
+    analyzer._request_power(4.0, -74.0, "20240101", "20240101")
+    
+    assert timeouts == [ClimateAnalyzer.REQUEST_TIMEOUT]
+    retries = analyzer.session.get_adapter(ClimateAnalyzer.NASA_POWER_BASE_URL).max_retries
+    assert retries.total == 3
+    assert 503 in retries.status_forcelist
+
+def test_climate_indicators_nan_falls_in_middle_bucket():
+    """Test de valores NaN: tramo central, en escalar y por lote."""
+    analyzer = ClimateAnalyzer(cache_dir="")
+    nan = float('nan')
+    climate = ClimateData(
+        solar_radiation=nan, precipitation=nan, temperature=nan,
+        wind_speed=nan, humidity=nan, eto=nan
+    )
+    
+    indicators = analyzer.calculate_climate_indicators(climate, "PALMA_ACEITERA")
+    batch = analyzer.calculate_climate_indicators_batch(
+        {field: np.array([nan]) for field in ('solar_radiation', 'precipitation', 'temperature', 'eto')},
+        "PALMA_ACEITERA"
+    )
+    
+    assert indicators['solar_radiation']['status'] == 'ÓPTIMA'
+    assert indicators['water_balance']['status'] == 'BALANCEADO'
+    for key in ('solar_radiation', 'precipitation', 'temperature', 'water_balance'):
+        assert batch[key][0] == indicators[key]['status']
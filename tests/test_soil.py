@@ -0,0 +1,102 @@
+# tests/test_soil.py
+import pytest
+from app.core.soil import SoilTextureAnalyzer
+
+@pytest.mark.parametrize("sand, silt, clay, expected", [
+    (20, 30, 50, "Arcilloso"),
+    (35, 35, 30, "Franco Arcilloso"),
+    (45, 35, 20, "Franco"),
+    (75, 15, 10, "Franco Arcilloso-Arenoso"),
+    (90, 5, 5, "Arenoso"),
+    (60, 20, 20, "Franco"),
+    (0, 0, 0, "NO_DETERMINADA"),
+])
+def test_classify_texture(sand, silt, clay, expected):
+    """Test de clasificación textural en cada clase."""
+    analyzer = SoilTextureAnalyzer("CACAO")
+    assert analyzer.classify_texture(sand, silt, clay) == expected
+
+def test_analyze_soil_batch_matches_scalar_methods():
+    """Test del análisis por lote frente a clasificación y propiedades escalares."""
+    import numpy as np
+    analyzer = SoilTextureAnalyzer("BANANO")
+    sand = np.array([20.0, 35.0, 45.0, 75.0, 90.0, 0.0])
+    silt = np.array([30.0, 35.0, 35.0, 15.0, 5.0, 0.0])
+    clay = np.array([50.0, 30.0, 20.0, 10.0, 5.0, 0.0])
+    om = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 3.0])
+    
+    batch = analyzer.analyze_soil_batch(sand, silt, clay, om)
+    
+    for i in range(len(sand)):
+        texture = analyzer.classify_texture(sand[i], silt[i], clay[i])
+        assert batch['texture_class'][i] == texture
+        expected = analyzer.calculate_physical_properties(texture, om[i])
+        for key, value in expected.items():
+            assert batch[key][i] == pytest.approx(value)
+
+def test_physical_properties_adjusted_by_organic_matter():
+    """Test de propiedades físicas con ajuste por materia orgánica."""
+    analyzer = SoilTextureAnalyzer("CACAO")
+    props = analyzer.calculate_physical_properties("Arcilloso", organic_matter=2.0)
+    
+    assert props['field_capacity'] == pytest.approx(350 * 1.1)
+    assert props['bulk_density'] == pytest.approx(1.3 / 1.1)
+    assert props['available_water'] == pytest.approx(150 * 1.1)
+    assert props['porosity'] == pytest.approx(0.55)
+    assert analyzer.calculate_physical_properties("Desconocida") == \
+        analyzer.calculate_physical_properties("Franco")
+
+def test_classify_texture_accepts_arrays():
+    """Test de clasificación vectorizada frente a la escalar."""
+    import numpy as np
+    from app.core.soil import _classify_texture_codes, _classify_texture_code
+    analyzer = SoilTextureAnalyzer("PALMA_ACEITERA")
+    rng = np.random.default_rng(3)
+    sand, silt, clay = rng.uniform(0, 90, (3, 500))
+    sand[0] = silt[0] = clay[0] = 0.0
+    
+    classes = analyzer.classify_texture(sand, silt, clay)
+    codes = _classify_texture_codes(sand, silt, clay)
+    
+    for i in range(len(sand)):
+        assert classes[i] == analyzer.classify_texture(sand[i], silt[i], clay[i])
+        assert codes[i] == _classify_texture_code(sand[i], silt[i], clay[i])
+
+@pytest.mark.parametrize("score, note", [
+    (0.2, "⚠️"), (0.4, "📋"), (0.6, "🔍"), (0.8, "✅"), (1.0, "✅"),
+])
+def test_texture_recommendations_by_suitability(score, note):
+    """Test de recomendaciones por textura y tramo de adecuación."""
+    analyzer = SoilTextureAnalyzer("CACAO")
+    
+    recommendations = analyzer.generate_texture_recommendations("Arenoso", score)
+    
+    assert recommendations[:-1] == tuple(SoilTextureAnalyzer.TEXTURE_RECOMMENDATIONS["Arenoso"])
+    assert recommendations[-1].startswith(note)
+    assert analyzer.generate_texture_recommendations("OTRA", score)[0].startswith(note)
+
+def test_evaluate_texture_suitability_array_matches_scalar():
+    """Test de adecuación en lote frente a la versión escalar."""
+    import numpy as np
+    analyzer = SoilTextureAnalyzer("PALMA_ACEITERA")
+    textures = np.array(["Franco", "Arenoso", "Arcilloso", "Franco", "NO_DETERMINADA"])
+    
+    categories, scores = analyzer.evaluate_texture_suitability(textures)
+    
+    for texture, category, score in zip(textures, categories, scores):
+        assert (category, score) == analyzer.evaluate_texture_suitability(str(texture))
+
+def test_classify_texture_batch_matches_scalar():
+    """Test de clasificación y adecuación en lote frente a llamadas escalares."""
+    import numpy as np
+    analyzer = SoilTextureAnalyzer("CACAO")
+    sand = np.array([20.0, 35.0, 45.0, 75.0, 90.0, 0.0])
+    silt = np.array([30.0, 35.0, 35.0, 15.0, 5.0, 0.0])
+    clay = np.array([50.0, 30.0, 20.0, 10.0, 5.0, 0.0])
+    
+    textures, categories, scores = analyzer.classify_texture_batch(sand, silt, clay)
+    
+    for i in range(len(sand)):
+        texture = analyzer.classify_texture(sand[i], silt[i], clay[i])
+        assert textures[i] == texture
+        assert (categories[i], scores[i]) == analyzer.evaluate_texture_suitability(texture)